@@ -1,6 +1,7 @@
 from django.contrib import admin
+from django.utils import timezone
 
-from .models import Post, Category, Location, Comment
+from .models import Post, Category, ImageBlob, Job, Location, Comment
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -27,6 +28,12 @@ class PostAdmin(admin.ModelAdmin):
     list_display_links = ('title',)
     list_filter = ('category', 'author', 'location')
 
+    def get_search_results(self, request, queryset, search_term):
+        """Ищет по полнотекстовому индексу вместо LIKE по заголовку."""
+        if not search_term.strip():
+            return queryset, False
+        return queryset.search(search_term), False
+
 
 class CategoryAdmin(admin.ModelAdmin):
     """Редактирование категорий"""
@@ -62,7 +69,57 @@ class LocationAdmin(admin.ModelAdmin):
     )
 
 
+class JobAdmin(admin.ModelAdmin):
+    """Просмотр фоновых заданий"""
+
+    list_display = (
+        'name',
+        'status',
+        'attempts',
+        'run_after',
+        'locked_by',
+        'finished_at',
+    )
+    list_filter = ('status', 'name')
+    readonly_fields = (
+        'attempts',
+        'locked_by',
+        'locked_until',
+        'started_at',
+        'finished_at',
+        'last_error',
+    )
+    actions = ('retry',)
+
+    @admin.action(description='Повторить выбранные задания')
+    def retry(self, request, queryset):
+        queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED,
+            attempts=0,
+            run_after=timezone.now(),
+        )
+
+
+class ImageBlobAdmin(admin.ModelAdmin):
+    """Просмотр файлов фото"""
+
+    list_display = (
+        'name',
+        'size',
+        'refcount',
+        'updated_at',
+    )
+    list_filter = ('refcount',)
+    readonly_fields = (
+        'name',
+        'size',
+        'refcount',
+    )
+
+
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(ImageBlob, ImageBlobAdmin)
+admin.site.register(Job, JobAdmin)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Post, PostAdmin)
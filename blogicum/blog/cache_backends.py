@@ -0,0 +1,22 @@
+import itertools
+
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+class SparselyCulledFileBasedCache(FileBasedCache):
+    """Файловый кеш, проверяющий переполнение не при каждой записи.
+
+    Стандартный бэкенд перед каждой записью перечисляет все файлы
+    каталога. Здесь это делается раз в CULL_EVERY записей, поэтому
+    MAX_ENTRIES может ненадолго превышаться.
+    """
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        options = params.get('OPTIONS', {})
+        self._cull_every = int(options.get('CULL_EVERY', 100))
+        self._writes = itertools.count(1)
+
+    def _cull(self):
+        if next(self._writes) % self._cull_every == 0:
+            super()._cull()
@@ -0,0 +1,106 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import urlencode
+
+from .models import Category, Comment, Post, User
+
+TAG_KEY_PREFIX = 'page-tag'
+PAGE_KEY_PREFIX = 'page'
+
+
+def _tag_key(tag):
+    return f'{TAG_KEY_PREFIX}:{tag}'
+
+
+def get_tag_versions(tags):
+    """Текущие версии тегов; отсутствующие создаются заново.
+
+    Версия тега — время его последнего сброса в наносекундах. Она
+    только растёт: и после вытеснения тега из кеша новая версия берётся
+    от текущего времени и не совпадает ни с одной из прежних.
+    """
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    missing = {
+        key: time.time_ns() for key in keys if key not in versions
+    }
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def _bump_tags(tags):
+    now = time.time_ns()
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    cache.set_many(
+        {key: max(now, versions.get(key, 0) + 1) for key in keys}, None
+    )
+
+
+def invalidate_tags(*tags):
+    """Делает недействительными страницы с любым из тегов.
+
+    Теги сбрасываются сразу и ещё раз после фиксации транзакции, чтобы
+    страница, собранная параллельным запросом до коммита, не осталась
+    в кеше.
+    """
+    _bump_tags(tags)
+    transaction.on_commit(lambda: _bump_tags(tags))
+
+
+def get_post_tags(post_id, category_id, author_id):
+    """Теги всех страниц, на которых выводится публикация."""
+    tags = ['feed', f'post:{post_id}']
+    slug = Category.objects.filter(
+        pk=category_id
+    ).values_list('slug', flat=True).first()
+    if slug is not None:
+        tags.append(f'category:{slug}')
+    username = User.objects.filter(
+        pk=author_id
+    ).values_list('username', flat=True).first()
+    if username is not None:
+        tags.append(f'profile:{username}')
+    return tags
+
+
+def get_author_tags(author_id, *usernames):
+    """Теги страниц, на которых выводятся имя и профиль автора.
+
+    Это его профиль, его публикации вместе со списками, где они
+    выводятся, и публикации с его комментариями.
+    """
+    tags = [f'profile:{username}' for username in usernames]
+    posts = Post.objects.filter(author_id=author_id).values_list(
+        'pk', 'category__slug'
+    )
+    for post_id, slug in posts:
+        tags.extend(['feed', f'post:{post_id}'])
+        if slug is not None:
+            tags.append(f'category:{slug}')
+    commented = Comment.objects.filter(author_id=author_id).values_list(
+        'post_id', flat=True
+    ).distinct()
+    tags.extend(f'post:{post_id}' for post_id in commented)
+    return list(dict.fromkeys(tags))
+
+
+def get_page_cache_key(request, tags, query_params=()):
+    """Ключ страницы по пути и параметрам запроса, которые читает view.
+
+    Остальные параметры на страницу не влияют и в ключ не входят, иначе
+    произвольные строки запроса заполняли бы кеш копиями одной страницы.
+    """
+    versions = get_tag_versions(tags)
+    query = urlencode([
+        (name, request.GET[name])
+        for name in query_params if name in request.GET
+    ])
+    raw_key = ':'.join([request.path, query, *map(str, versions)])
+    digest = hashlib.md5(raw_key.encode()).hexdigest()
+    return f'{PAGE_KEY_PREFIX}:{digest}'
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def apply_sqlite_pragmas(cursor, pragmas):
+    """Выполняет PRAGMA для соединения с SQLite.
+
+    journal_mode=WAL позволяет читать во время записи, busy_timeout
+    заставляет писателей ждать блокировку вместо ошибки
+    «database is locked», а synchronous=NORMAL в режиме WAL
+    не теряет согласованность при сбое процесса.
+    """
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        apply_sqlite_pragmas(cursor, settings.SQLITE_PRAGMAS)
+
+
+def insert_raw(model, objects, using=DEFAULT_DB_ALIAS):
+    """Вставляет объекты пачками, сохраняя значения полей как есть.
+
+    В отличие от bulk_create, даты с auto_now_add не перезаписываются:
+    это тот же INSERT в raw-режиме, что и при loaddata. Пустые даты
+    с auto_now и auto_now_add заполняются текущим временем.
+    """
+    fields = model._meta.local_concrete_fields
+    auto_fields = [
+        field for field in fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    for obj in objects:
+        for field in auto_fields:
+            if getattr(obj, field.attname) is None:
+                field.pre_save(obj, add=True)
+    connection = connections[using]
+    size = max(connection.ops.bulk_batch_size(fields, objects), 1)
+    for start in range(0, len(objects), size):
+        model._base_manager._insert(
+            objects[start:start + size], fields=fields, using=using, raw=True
+        )
@@ -1,7 +1,10 @@
 from django import forms
 from django.contrib.auth import get_user_model
+from django.contrib.auth.forms import PasswordResetForm
 
+from .jobs import enqueue
 from .models import Post, Comment, User
+from .tasks import send_password_reset_email
 
 User = get_user_model()
 
@@ -30,3 +33,26 @@ class UserForm(forms.ModelForm):
     class Meta:
         model = User
         fields = ('username', 'first_name', 'last_name', 'email')
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Сброс пароля, письмо для которого отправляет фоновое задание.
+
+    В задание попадают только пользователь и адрес сайта: письмо
+    со ссылкой собирается при отправке.
+    """
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        enqueue(
+            send_password_reset_email,
+            user_id=context['user'].pk,
+            domain=context['domain'],
+            site_name=context['site_name'],
+            protocol=context['protocol'],
+            subject_template_name=subject_template_name,
+            email_template_name=email_template_name,
+            from_email=from_email,
+            html_email_template_name=html_email_template_name,
+        )
@@ -0,0 +1,139 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+VARIANTS_DIR = 'variants'
+# Формат Pillow, тип для <source> и параметры сохранения.
+ENCODERS = {
+    'JPEG': ('image/jpeg', 'jpg', {
+        'quality': 82, 'optimize': True, 'progressive': True,
+    }),
+    'PNG': ('image/png', 'png', {'optimize': True}),
+    'WEBP': ('image/webp', 'webp', {'quality': 80, 'method': 6}),
+    'AVIF': ('image/avif', 'avif', {'quality': 60}),
+}
+
+
+def get_modern_formats():
+    """Форматы из POST_IMAGE_FORMATS, которые умеет сохранять Pillow."""
+    Image.init()
+    return [
+        image_format for image_format in settings.POST_IMAGE_FORMATS
+        if image_format in Image.SAVE
+    ]
+
+
+def _encode(image, image_format, has_alpha):
+    if image_format == 'JPEG' or not has_alpha:
+        image = image.convert('RGB')
+    elif image.mode != 'RGBA':
+        image = image.convert('RGBA')
+    buffer = BytesIO()
+    image.save(buffer, image_format, **ENCODERS[image_format][2])
+    return buffer.getvalue()
+
+
+class VariantWriter:
+    """Сохраняет копии фото рядом с ним в каталог variants."""
+
+    def __init__(self, image, source):
+        self.storage = image.storage
+        self.path = PurePosixPath(image.name)
+        self.source = source
+        self.has_alpha = source.mode in ('RGBA', 'LA', 'P')
+
+    def save(self, width, image_format):
+        if width == self.source.width:
+            resized = self.source
+        else:
+            resized = self.source.resize(
+                (width, round(self.source.height * width / self.source.width)),
+                Image.LANCZOS,
+            )
+        extension = ENCODERS[image_format][1]
+        return self.storage.save(
+            str(
+                self.path.parent / VARIANTS_DIR
+                / f'{self.path.stem}-{width}w.{extension}'
+            ),
+            ContentFile(_encode(resized, image_format, self.has_alpha)),
+        )
+
+
+def make_variants(image):
+    """Уменьшенные копии фото шириной из POST_IMAGE_WIDTHS.
+
+    Копии в исходном формате (JPEG или PNG) создаются только уже
+    оригинала, а в форматах из POST_IMAGE_FORMATS — ещё и в полную
+    ширину. Возвращает описание для Post.image_variants.
+    """
+    image.open('rb')
+    try:
+        with Image.open(image) as source:
+            source = ImageOps.exif_transpose(source)
+            writer = VariantWriter(image, source)
+            widths = [
+                width for width in sorted(settings.POST_IMAGE_WIDTHS)
+                if width < source.width
+            ]
+            fallback = 'PNG' if writer.has_alpha else 'JPEG'
+            variants = {
+                str(width): writer.save(width, fallback) for width in widths
+            }
+            formats = {
+                ENCODERS[image_format][0]: {
+                    str(width): writer.save(width, image_format)
+                    for width in [*widths, source.width]
+                }
+                for image_format in get_modern_formats()
+            }
+            width, height = source.size
+    finally:
+        image.close()
+    return {
+        'source': image.name,
+        'width': width,
+        'height': height,
+        'variants': variants,
+        'formats': formats,
+    }
+
+
+def iter_variant_names(image_variants):
+    yield from image_variants.get('variants', {}).values()
+    for variants in image_variants.get('formats', {}).values():
+        yield from variants.values()
+
+
+def _srcset(storage, variants):
+    return ', '.join(
+        f'{storage.url(name)} {width}w'
+        for width, name in sorted(
+            variants.items(), key=lambda item: int(item[0])
+        )
+    )
+
+
+def get_srcset(image, image_variants):
+    """Значение атрибута srcset: копии и оригинал с их ширинами."""
+    if not image or image_variants.get('source') != image.name:
+        return ''
+    return _srcset(image.storage, {
+        **image_variants['variants'],
+        str(image_variants['width']): image.name,
+    })
+
+
+def get_sources(image, image_variants):
+    """Пары (тип, srcset) для тегов <source> внутри <picture>."""
+    if not image or image_variants.get('source') != image.name:
+        return []
+    return [
+        (content_type, _srcset(image.storage, variants))
+        for content_type, variants in image_variants.get(
+            'formats', {}
+        ).items()
+    ]
@@ -0,0 +1,236 @@
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger('blog.jobs')
+
+# Зарегистрированные задачи по имени; заполняет декоратор task.
+registry = {}
+# Сколько подходящих заданий просматривается за одну попытку захвата.
+CLAIM_BATCH = 10
+
+
+def task(func):
+    """Регистрирует функцию как задачу для enqueue."""
+    func.task_name = f'{func.__module__}.{func.__name__}'
+    registry[func.task_name] = func
+    return func
+
+
+def enqueue(func, *, key='', delay=None, max_attempts=None, **payload):
+    """Ставит задачу в очередь с аргументами из payload.
+
+    Задание добавляется в текущей транзакции, поэтому исполнитель
+    видит его только вместе с изменениями, ради которых оно создано.
+    """
+    if key:
+        queued = Job.objects.filter(status=Job.QUEUED, key=key).first()
+        if queued is not None:
+            return queued
+    job = Job(name=func.task_name, payload=payload, key=key)
+    if delay is not None:
+        job.run_after = timezone.now() + delay
+    if max_attempts is not None:
+        job.max_attempts = max_attempts
+    job.save()
+    return job
+
+
+def get_retry_delay(attempts):
+    """Пауза перед повтором: растёт вдвое с каждой попыткой."""
+    delay = min(
+        settings.JOB_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.JOB_RETRY_MAX_DELAY,
+    )
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+class Heartbeat(threading.Thread):
+    """Продлевает блокировку задания, пока оно выполняется.
+
+    Блокировка обновляется трижды за visibility_timeout, поэтому
+    долгое задание не истекает, пока исполнитель жив.
+    """
+
+    def __init__(self, job, visibility_timeout):
+        super().__init__(daemon=True)
+        self.job = job
+        self.visibility_timeout = visibility_timeout
+        self.stopped = threading.Event()
+
+    def run(self):
+        interval = self.visibility_timeout.total_seconds() / 3
+        try:
+            while not self.stopped.wait(interval):
+                if not self.beat():
+                    return
+        finally:
+            connection.close()
+
+    def beat(self):
+        """Продлевает блокировку; False, если задание уже не наше."""
+        try:
+            return bool(Job.objects.filter(
+                pk=self.job.pk, status=Job.RUNNING,
+                locked_by=self.job.locked_by,
+            ).update(locked_until=timezone.now() + self.visibility_timeout))
+        except DatabaseError:
+            logger.warning(
+                'Не удалось продлить блокировку задания %s.', self.job.pk,
+                exc_info=True,
+            )
+            return True
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class Worker:
+    """Исполнитель заданий из таблицы Job.
+
+    Задание захватывается условным UPDATE: из нескольких исполнителей,
+    выбравших одно задание, строку меняет только первый. Захваченное
+    задание блокируется на visibility_timeout секунд, и блокировка
+    продлевается, пока задание выполняется. Если исполнитель пропал
+    и не продлил блокировку, задание снова становится доступным,
+    поэтому задачи должны выдерживать повторное выполнение.
+    """
+
+    def __init__(self, concurrency=1, visibility_timeout=None,
+                 poll_interval=1.0, burst=False):
+        self.concurrency = concurrency
+        self.visibility_timeout = timedelta(seconds=(
+            visibility_timeout or settings.JOB_VISIBILITY_TIMEOUT
+        ))
+        self.poll_interval = poll_interval
+        self.burst = burst
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+        self.metrics = Counter()
+        self.metrics_lock = threading.Lock()
+
+    def run(self):
+        if self.concurrency == 1:
+            self.loop(f'{self.name}:0')
+            return self.metrics
+        threads = [
+            threading.Thread(
+                target=self.run_thread, args=(f'{self.name}:{number}',)
+            )
+            for number in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.metrics
+
+    def stop(self):
+        """Завершает работу после текущих заданий."""
+        self.stopping.set()
+
+    def run_thread(self, worker_name):
+        try:
+            self.loop(worker_name)
+        finally:
+            connection.close()
+
+    def loop(self, worker_name):
+        while not self.stopping.is_set():
+            job = self.claim(worker_name)
+            if job is not None:
+                self.execute(job)
+            elif self.burst:
+                return
+            else:
+                self.stopping.wait(self.poll_interval)
+
+    def claim(self, worker_name):
+        now = timezone.now()
+        candidates = list(
+            Job.objects.due(now).order_by('run_after').values_list(
+                'pk', flat=True
+            )[:CLAIM_BATCH]
+        )
+        for pk in candidates:
+            claimed = Job.objects.due(now).filter(pk=pk).update(
+                status=Job.RUNNING,
+                locked_by=worker_name,
+                locked_until=now + self.visibility_timeout,
+                attempts=F('attempts') + 1,
+                started_at=now,
+            )
+            if claimed:
+                return Job.objects.get(pk=pk)
+        return None
+
+    def execute(self, job):
+        started = time.perf_counter()
+        func = registry.get(job.name)
+        heartbeat = Heartbeat(job, self.visibility_timeout)
+        heartbeat.start()
+        try:
+            if job.attempts > job.max_attempts:
+                raise TimeoutError(
+                    'Исполнитель не отчитался до истечения блокировки.'
+                )
+            if func is None:
+                raise LookupError(f'Неизвестная задача {job.name}.')
+            func(**job.payload)
+        except Exception:
+            status = self.fail(job, traceback.format_exc())
+        else:
+            status = self.finish(
+                job, Job.DONE, last_error='', finished_at=timezone.now()
+            )
+        finally:
+            heartbeat.stop()
+        self.report(job, status, time.perf_counter() - started)
+
+    def finish(self, job, status, **changes):
+        """Записывает итог, если задание всё ещё за этим исполнителем."""
+        updated = Job.objects.filter(
+            pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by
+        ).update(status=status, locked_until=None, **changes)
+        return status if updated else 'lost'
+
+    def fail(self, job, error):
+        if job.attempts >= job.max_attempts:
+            return self.finish(
+                job, Job.FAILED,
+                last_error=error, finished_at=timezone.now(),
+            )
+        return self.finish(
+            job, Job.QUEUED,
+            last_error=error,
+            run_after=timezone.now() + get_retry_delay(job.attempts),
+        )
+
+    def report(self, job, status, duration):
+        with self.metrics_lock:
+            self.metrics[status] += 1
+        logger.info(json.dumps({
+            'job': job.pk,
+            'name': job.name,
+            'status': status,
+            'attempt': job.attempts,
+            'wait_ms': round(
+                (job.started_at - job.run_after).total_seconds() * 1000, 2
+            ),
+            'duration_ms': round(duration * 1000, 2),
+        }))
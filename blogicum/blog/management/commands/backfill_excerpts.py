@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.models import MAX_LENGTH_CHAR_FIELD, Post
+from blog.utils import make_excerpt
+
+
+class Command(BaseCommand):
+    help = 'Заполняет начало текста у существующих публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько публикаций обновлять за один запрос.',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересчитать и уже заполненные значения.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.order_by('pk').only('pk', 'text', 'excerpt')
+        if not options['all']:
+            posts = posts.filter(excerpt='')
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            now = timezone.now()
+            changed = []
+            for post in batch:
+                excerpt = make_excerpt(post.text, MAX_LENGTH_CHAR_FIELD)
+                if excerpt != post.excerpt:
+                    post.excerpt = excerpt
+                    post.updated_at = now
+                    changed.append(post)
+            Post.objects.bulk_update(changed, ['excerpt', 'updated_at'])
+            updated += len(changed)
+            last_pk = batch[-1].pk
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}')
+        )
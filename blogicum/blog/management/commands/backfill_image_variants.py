@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии фото у существующих публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересоздать и уже готовые копии.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').order_by('pk').only(
+            'pk', 'image', 'image_variants'
+        )
+        updated = failed = 0
+        for post in posts.iterator():
+            try:
+                updated += post.update_image_variants(force=options['all'])
+            except OSError as error:
+                failed += 1
+                self.stderr.write(f'Публикация {post.pk}: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено публикаций: {updated}, с ошибками: {failed}'
+        ))
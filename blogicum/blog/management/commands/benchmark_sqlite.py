@@ -0,0 +1,187 @@
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from blog.db import apply_sqlite_pragmas
+from blog.models import Comment, Post, User
+from blog.views import MAX_AMOUNT_POSTS, get_posts_queryset
+
+# Сколько первых страниц ленты по очереди читают читатели.
+MAX_PAGES = 100
+# Таймаут ожидания блокировки, с которым Django открывает соединение,
+# если в OPTIONS базы не задан свой.
+DEFAULT_TIMEOUT = 5.0
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность чтения и записи SQLite '
+        'с настройками по умолчанию и с SQLITE_PRAGMAS на копии '
+        'базы проекта.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        source = connections[options['database']]
+        if source.vendor != 'sqlite':
+            raise CommandError('Сравнение доступно только для SQLite.')
+        self.timeout = source.settings_dict['OPTIONS'].get(
+            'timeout', DEFAULT_TIMEOUT
+        )
+        self.ops = source.ops
+        pages = self.get_feed_pages(source)
+        post_ids = list(
+            Post.objects.using(source.alias).order_by('-pk').values_list(
+                'pk', flat=True
+            )[:options['writers']]
+        )
+        author_id = User.objects.using(source.alias).values_list(
+            'pk', flat=True
+        ).first()
+        if not pages or not post_ids:
+            raise CommandError(
+                'В базе нет публикаций: заполните её командой seed_data.'
+            )
+        writes = [
+            self.get_comment_writes(source, post_id, author_id)
+            for post_id in post_ids
+        ]
+        modes = {
+            'default': {'journal_mode': 'DELETE'},
+            'tuned': settings.SQLITE_PRAGMAS,
+        }
+        source.ensure_connection()
+        with tempfile.TemporaryDirectory() as directory:
+            for mode, pragmas in modes.items():
+                path = Path(directory) / f'{mode}.sqlite3'
+                self.copy_database(source, path, pragmas)
+                result = self.run(path, pragmas, pages, writes, options)
+                seconds = options['seconds']
+                self.stdout.write(
+                    f'{mode}: чтений {result["reads"] / seconds:.0f}/с, '
+                    f'записей {result["writes"] / seconds:.0f}/с, '
+                    f'ошибок блокировки {result["locked"]}'
+                )
+
+    def get_feed_pages(self, source):
+        """SQL первых страниц ленты в том виде, как их строит Django."""
+        queryset = get_posts_queryset(filters=True).defer('text').using(
+            source.alias
+        )
+        total = queryset.count()
+        pages = []
+        for offset in range(0, min(total, MAX_PAGES * MAX_AMOUNT_POSTS),
+                            MAX_AMOUNT_POSTS):
+            page = queryset[offset:offset + MAX_AMOUNT_POSTS]
+            sql, params = page.query.get_compiler(source.alias).as_sql()
+            pages.append((sql.replace('%s', '?'), params))
+        return pages
+
+    def get_comment_writes(self, source, post_id, author_id):
+        """Запросы добавления комментария, как в CommentCreateView.
+
+        Вместе с комментарием обновляются счётчик и версия публикации,
+        как это делает сигнал count_saved_comment.
+        """
+        comment = Comment._meta
+        post = Post._meta
+        return [
+            (
+                f'INSERT INTO {comment.db_table} '
+                f'({comment.get_field("text").column}, '
+                f'{comment.get_field("post").column}, '
+                f'{comment.get_field("author").column}, '
+                f'{comment.get_field("created_at").column}) '
+                'VALUES (?, ?, ?, ?)',
+                ['Комментарий', post_id, author_id],
+            ),
+            (
+                f'UPDATE {post.db_table} SET '
+                f'comment_count = comment_count + 1, updated_at = ? '
+                f'WHERE {post.pk.column} = ?',
+                [post_id],
+            ),
+        ]
+
+    def connect(self, path, pragmas):
+        connection = sqlite3.connect(
+            path, timeout=self.timeout, isolation_level=None
+        )
+        apply_sqlite_pragmas(connection.cursor(), pragmas)
+        return connection
+
+    def copy_database(self, source, path, pragmas):
+        target = sqlite3.connect(path)
+        source.connection.backup(target)
+        target.close()
+        self.connect(path, pragmas).close()
+
+    def run(self, path, pragmas, pages, writes, options):
+        self.result = {'reads': 0, 'writes': 0, 'locked': 0}
+        self.lock = threading.Lock()
+        deadline = time.monotonic() + options['seconds']
+        threads = [
+            threading.Thread(
+                target=self.read, args=[path, pragmas, deadline, pages]
+            )
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(
+                target=self.write,
+                args=[path, pragmas, deadline, writes[number % len(writes)]],
+            )
+            for number in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.result
+
+    def count(self, key):
+        with self.lock:
+            self.result[key] += 1
+
+    def read(self, path, pragmas, deadline, pages):
+        connection = self.connect(path, pragmas)
+        number = 0
+        while time.monotonic() < deadline:
+            sql, params = pages[number]
+            try:
+                connection.execute(sql, params).fetchall()
+            except sqlite3.OperationalError:
+                self.count('locked')
+                continue
+            number = (number + 1) % len(pages)
+            self.count('reads')
+        connection.close()
+
+    def write(self, path, pragmas, deadline, writes):
+        (insert, insert_params), (update, update_params) = writes
+        connection = self.connect(path, pragmas)
+        while time.monotonic() < deadline:
+            now = self.ops.adapt_datetimefield_value(timezone.now())
+            try:
+                connection.execute('BEGIN IMMEDIATE')
+                connection.execute(insert, [*insert_params, now])
+                connection.execute(update, [now, *update_params])
+                connection.execute('COMMIT')
+            except sqlite3.OperationalError:
+                if connection.in_transaction:
+                    connection.execute('ROLLBACK')
+                self.count('locked')
+                continue
+            self.count('writes')
+        connection.close()
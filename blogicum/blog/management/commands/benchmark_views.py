@@ -0,0 +1,183 @@
+import json
+import statistics
+import tempfile
+import time
+from copy import deepcopy
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from blog.models import Post
+from blog.urls import urlpatterns as blog_urlpatterns
+from pages.urls import urlpatterns as pages_urlpatterns
+
+ROUTES = (('blog', blog_urlpatterns), ('pages', pages_urlpatterns))
+PERCENTILES = (50, 90, 99)
+# Адрес вне INTERNAL_IPS, чтобы debug_toolbar не встраивался в ответы.
+REMOTE_ADDR = '192.0.2.1'
+HOST = 'localhost'
+
+
+def iter_routes(patterns, kwargs=()):
+    """Имена маршрутов и имена их параметров, включая вложенные include."""
+    for pattern in patterns:
+        names = (*kwargs, *pattern.pattern.converters)
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns, names)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name, names
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = round(percent / 100 * (len(ordered) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время ответа, число SQL-запросов и размер страницы для '
+        'каждого маршрута blog и pages и сохраняет результаты в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--output', help='Файл результатов; по умолчанию с датой.'
+        )
+        parser.add_argument(
+            '--compare', help='Прошлые результаты для сравнения.'
+        )
+        parser.add_argument(
+            '--warm-cache',
+            action='store_true',
+            help='Не очищать кеш перед каждым запросом.',
+        )
+
+    def handle(self, *args, **options):
+        # Замеры идут на собственном кеше с теми же настройками, чтобы
+        # очистка перед запросами не сбрасывала кеш работающего сайта.
+        caches = deepcopy(settings.CACHES)
+        with tempfile.TemporaryDirectory() as directory:
+            caches['default']['LOCATION'] = directory
+            with override_settings(CACHES=caches):
+                self.benchmark(options)
+
+    def benchmark(self, options):
+        post = self.get_sample_post()
+        comments = post.comments.values_list('pk', flat=True)
+        kwargs = {
+            'post_id': post.pk,
+            # Комментарий автора поста, чтобы его формы тоже открывались.
+            'comment_id': (
+                comments.filter(author=post.author).first()
+                or comments.first()
+            ),
+            'category_slug': post.category.slug,
+            'username': post.author.username,
+        }
+        # Строка запроса для маршрутов, которым без неё нечего показать.
+        query = {'blog:search': {'q': post.title.split()[0]}}
+        clients = {
+            role: Client(HTTP_HOST=HOST, REMOTE_ADDR=REMOTE_ADDR)
+            for role in ('anonymous', 'author')
+        }
+        clients['author'].force_login(post.author)
+
+        results = []
+        for namespace, patterns in ROUTES:
+            for name, params in iter_routes(patterns):
+                if any(kwargs.get(param) is None for param in params):
+                    self.stderr.write(f'{namespace}:{name}: нет данных')
+                    continue
+                route = f'{namespace}:{name}'
+                url = reverse(
+                    route, kwargs={param: kwargs[param] for param in params}
+                )
+                if route in query:
+                    url = f'{url}?{urlencode(query[route])}'
+                for role, client in clients.items():
+                    result = self.measure(client, url, options)
+                    results.append(
+                        {'route': route, 'role': role, 'url': url, **result}
+                    )
+                    self.report(results[-1])
+
+        output = options['output'] or (
+            f'benchmark-{timezone.now():%Y%m%d-%H%M%S}.json'
+        )
+        with open(output, 'w', encoding='utf-8') as file:
+            json.dump(
+                {'created_at': timezone.now().isoformat(),
+                 'repeat': options['repeat'], 'results': results},
+                file, ensure_ascii=False, indent=2,
+            )
+        self.stdout.write(f'Результаты сохранены в {output}')
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def get_sample_post(self):
+        """Самый обсуждаемый опубликованный пост."""
+        post = Post.objects.filter(
+            is_published=True, category__is_published=True, is_live=True,
+        ).order_by('-comment_count').select_related(
+            'author', 'category'
+        ).first()
+        if post is None:
+            raise CommandError(
+                'Нет опубликованных постов; заполните базу seed_data.'
+            )
+        return post
+
+    def measure(self, client, url, options):
+        timings, queries = [], []
+        for _ in range(options['repeat']):
+            if not options['warm_cache']:
+                cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+        return {
+            'status': response.status_code,
+            'bytes': len(response.content),
+            'queries': max(queries),
+            'mean_ms': round(statistics.mean(timings), 2),
+            **{
+                f'p{percent}_ms': round(percentile(timings, percent), 2)
+                for percent in PERCENTILES
+            },
+        }
+
+    def report(self, result):
+        self.stdout.write(
+            f'{result["route"]:<24} {result["role"]:<9} '
+            f'{result["status"]} p50 {result["p50_ms"]:8.2f} мс '
+            f'p99 {result["p99_ms"]:8.2f} мс '
+            f'запросов {result["queries"]:3} байт {result["bytes"]}'
+        )
+
+    def compare(self, path, results):
+        with open(path, encoding='utf-8') as file:
+            previous = {
+                (item['route'], item['role']): item
+                for item in json.load(file)['results']
+            }
+        self.stdout.write(f'Сравнение с {path} (p50, запросы):')
+        for result in results:
+            before = previous.get((result['route'], result['role']))
+            if before is None:
+                continue
+            self.stdout.write(
+                f'{result["route"]:<24} {result["role"]:<9} '
+                f'{before["p50_ms"]:8.2f} → {result["p50_ms"]:8.2f} мс, '
+                f'{before["queries"]} → {result["queries"]}'
+            )
@@ -0,0 +1,83 @@
+import os
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.models import ImageBlob, Post
+from blog.storage import INCOMING_DIR, post_image_storage
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы фото, на которые не ссылается ни одна публикация: '
+        'оставшиеся после удаления публикаций, замены фото и '
+        'прерванных загрузок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=float, default=24,
+            help='Не трогать файлы, изменённые за это число часов.',
+        )
+        parser.add_argument(
+            '--skip-recount',
+            action='store_true',
+            help='Доверять счётчикам ссылок и не искать файлы без учёта.',
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        self.deleted = self.freed = 0
+        if not options['skip_recount']:
+            changed = ImageBlob.objects.recount()
+            self.stdout.write(f'Исправлено счётчиков ссылок: {changed}')
+
+        unused = ImageBlob.objects.filter(
+            refcount=0, updated_at__lt=self.cutoff
+        )
+        for blob in unused.iterator():
+            if self.delete_file(blob.name) and not self.dry_run:
+                ImageBlob.objects.filter(pk=blob.pk, refcount=0).delete()
+
+        if not options['skip_recount']:
+            self.delete_untracked()
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено файлов: {self.deleted}, освобождено байт: {self.freed}'
+        ))
+
+    def delete_file(self, name):
+        """Удаляет файл, если он не менялся в течение отсрочки."""
+        path = post_image_storage.path(name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return True
+        modified = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        if modified >= self.cutoff:
+            return False
+        if not self.dry_run:
+            os.remove(path)
+        self.deleted += 1
+        self.freed += stat.st_size
+        return True
+
+    def delete_untracked(self):
+        """Файлы без записи ImageBlob: прерванные и ранние загрузки.
+
+        После пересчёта у каждого файла, на который ссылается
+        публикация, есть запись, поэтому остальные можно удалять.
+        """
+        tracked = set(ImageBlob.objects.values_list('name', flat=True))
+        for directory in (Post.image.field.upload_to, INCOMING_DIR):
+            root = post_image_storage.path(directory)
+            for dirpath, dirnames, filenames in os.walk(root):
+                for filename in filenames:
+                    name = os.path.relpath(
+                        os.path.join(dirpath, filename),
+                        post_image_storage.location,
+                    ).replace(os.sep, '/')
+                    if name not in tracked:
+                        self.delete_file(name)
@@ -0,0 +1,116 @@
+import gzip
+import sys
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from blog.models import Comment, Post
+
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+    'is_published': 'is_published',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'location__name',
+    'comment_count': 'comment_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'author': 'author__username',
+    'text': 'text',
+    'created_at': 'created_at',
+}
+
+
+def parse_since(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f'Некорректная дата: {value}')
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает публикации вместе с комментариями в JSONL, сжатый gzip. '
+        'Строки читаются из базы порциями, память не зависит от объёма.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output', help='Файл для выгрузки; «-» — стандартный вывод.'
+        )
+        parser.add_argument(
+            '--since',
+            help='Только публикации, изменённые начиная с этого момента.',
+        )
+        parser.add_argument('--author', help='Имя пользователя автора.')
+        parser.add_argument('--category', help='Слаг категории.')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started_at = timezone.now()
+        posts = self.get_posts(options)
+        comments = Comment.objects.filter(
+            post__in=posts.values('pk')
+        ).order_by('post_id', 'created_at', 'id')
+
+        if options['output'] == '-':
+            output = gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb')
+        else:
+            output = gzip.open(options['output'], 'wb')
+        with output:
+            exported = self.write(
+                output, posts, comments, options['chunk_size']
+            )
+        self.stderr.write(
+            f'Выгружено публикаций: {exported}. '
+            f'Для следующей выгрузки: --since {started_at.isoformat()}'
+        )
+
+    def get_posts(self, options):
+        posts = Post.objects.order_by('pk')
+        if options['since']:
+            posts = posts.filter(
+                updated_at__gte=parse_since(options['since'])
+            )
+        if options['author']:
+            posts = posts.filter(author__username=options['author'])
+        if options['category']:
+            posts = posts.filter(category__slug=options['category'])
+        return posts
+
+    def write(self, output, posts, comments, chunk_size):
+        """Сливает два упорядоченных по публикации потока строк."""
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        comment_rows = comments.values_list(
+            'post_id', *COMMENT_FIELDS.values()
+        ).iterator(chunk_size=chunk_size)
+        comment = next(comment_rows, None)
+        exported = 0
+        for row in posts.values_list(
+            *POST_FIELDS.values()
+        ).iterator(chunk_size=chunk_size):
+            record = dict(zip(POST_FIELDS, row))
+            record['comments'] = []
+            while comment is not None and comment[0] <= record['id']:
+                if comment[0] == record['id']:
+                    record['comments'].append(
+                        dict(zip(COMMENT_FIELDS, comment[1:]))
+                    )
+                comment = next(comment_rows, None)
+            output.write(encoder.encode(record).encode() + b'\n')
+            exported += 1
+        return exported
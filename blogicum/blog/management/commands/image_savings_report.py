@@ -0,0 +1,55 @@
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает размер копий фото в современных форматах с размером '
+        'тех же ширин в исходном формате по файлам в MEDIA_ROOT.'
+    )
+
+    def handle(self, *args, **options):
+        totals = defaultdict(Counter)
+        missing = 0
+        posts = Post.objects.exclude(image='').only('image', 'image_variants')
+        for post in posts.iterator():
+            if post.image_variants.get('source') != post.image.name:
+                missing += 1
+                continue
+            try:
+                self.add_sizes(totals, post.image, post.image_variants)
+            except OSError as error:
+                self.stderr.write(f'Публикация {post.pk}: {error}')
+
+        self.stdout.write(
+            f'{"Формат":<12} {"файлов":>8} {"исходный":>14} '
+            f'{"новый":>14} {"экономия":>9}'
+        )
+        for content_type, total in sorted(totals.items()):
+            saved = 1 - total['bytes'] / total['baseline']
+            self.stdout.write(
+                f'{content_type:<12} {total["files"]:>8} '
+                f'{total["baseline"]:>14} {total["bytes"]:>14} '
+                f'{saved:>9.1%}'
+            )
+        if missing:
+            self.stdout.write(self.style.WARNING(
+                f'Публикаций без копий: {missing}; '
+                'запустите backfill_image_variants.'
+            ))
+
+    def add_sizes(self, totals, image, image_variants):
+        storage = image.storage
+        baseline = {
+            **image_variants['variants'],
+            str(image_variants['width']): image.name,
+        }
+        for content_type, variants in image_variants['formats'].items():
+            total = totals[content_type]
+            for width, name in variants.items():
+                total['files'] += 1
+                total['baseline'] += storage.size(baseline[width])
+                total['bytes'] += storage.size(name)
@@ -0,0 +1,199 @@
+import gzip
+import json
+import time
+from array import array
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer
+from django.db import (
+    DEFAULT_DB_ALIAS, DatabaseError, connections, reset_queries, transaction
+)
+
+from blog.caching import invalidate_tags
+from blog.db import insert_raw
+from blog.models import Comment, Post
+from blog.paginators import invalidate_post_counts
+
+# Порядок совпадает с зависимостями по внешним ключам: модель
+# сохраняется только после всех моделей, на которые она ссылается.
+IMPORTED_MODELS = (
+    'auth.user',
+    'blog.category',
+    'blog.location',
+    'blog.post',
+    'blog.comment',
+)
+READ_SIZE = 64 * 1024
+PROGRESS_EVERY = 100_000
+# Сколько ключей удаляется одним запросом при откате загрузки.
+DELETE_BATCH_SIZE = 500
+WHITESPACE = ' \t\r\n'
+
+
+def _skip(stream, buffer, position, characters, read_size):
+    """Пропускает символы из characters, при необходимости дочитывая поток."""
+    while True:
+        while position < len(buffer) and buffer[position] in characters:
+            position += 1
+        if position < len(buffer):
+            return buffer, position
+        buffer, position = stream.read(read_size), 0
+        if not buffer:
+            raise DeserializationError('Файл закончился внутри массива')
+
+
+def iter_json_array(stream, read_size=READ_SIZE):
+    """Отдаёт элементы JSON-массива по одному, не читая файл целиком."""
+    decoder = json.JSONDecoder()
+    buffer, position = _skip(stream, '', 0, WHITESPACE, read_size)
+    if buffer[position] != '[':
+        raise DeserializationError('Ожидался JSON-массив')
+    position += 1
+    while True:
+        buffer, position = _skip(
+            stream, buffer, position, WHITESPACE + ',', read_size
+        )
+        if buffer[position] == ']':
+            return
+        while True:
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+                break
+            except json.JSONDecodeError as error:
+                chunk = stream.read(read_size)
+                if not chunk:
+                    raise DeserializationError(str(error)) from error
+                buffer, position = buffer[position:] + chunk, 0
+        yield item
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает дамп в формате dumpdata потоково, вставляя объекты '
+        'пачками. Поддерживаются пользователи, категории, '
+        'местоположения, публикации и комментарии; объекты с уже '
+        'занятыми ключами не перезаписываются, а прерывают загрузку. '
+        'Пачки сохраняются по мере загрузки, а после ошибки всё, '
+        'что успело загрузиться, удаляется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл .json или .json.gz.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        self.using = options['database']
+        self.batch_size = options['batch_size']
+        self.models = [apps.get_model(label) for label in IMPORTED_MODELS]
+        self.buffers = {model: [] for model in self.models}
+        self.inserted = {model: 0 for model in self.models}
+        self.inserted_pks = {model: array('q') for model in self.models}
+        skipped = 0
+        started = time.monotonic()
+
+        opener = gzip.open if options['path'].endswith('.gz') else open
+        connection = connections[self.using]
+        # Каждая пачка сохраняется своей транзакцией, чтобы загрузка
+        # не держала блокировку записи SQLite всё время. Объект может
+        # ссылаться на ещё не загруженный, поэтому внешние ключи
+        # проверяются один раз в конце, как в loaddata. При ошибке
+        # сохранённые пачки удаляются, чтобы в базе не осталось
+        # объектов со ссылками на незагруженные.
+        try:
+            with opener(options['path'], 'rt', encoding='utf-8') as stream:
+                with connection.constraint_checks_disabled():
+                    for data in iter_json_array(stream):
+                        if data.get('model', '').lower() in IMPORTED_MODELS:
+                            self.add(data)
+                        else:
+                            skipped += 1
+                    self.flush(self.models[-1])
+            with transaction.atomic(using=self.using):
+                self.finish()
+        except (OSError, DeserializationError, DatabaseError) as error:
+            self.rollback()
+            raise CommandError(
+                f'Не удалось загрузить дамп: {error}. Удалено уже '
+                f'сохранённых объектов: {sum(self.inserted.values())}.'
+            )
+
+        elapsed = time.monotonic() - started
+        total = sum(self.inserted.values())
+        for model, count in self.inserted.items():
+            self.stdout.write(f'{model._meta.label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-6):.0f} в секунду), '
+            f'пропущено: {skipped}'
+        ))
+
+    def add(self, data):
+        for deserialized in Deserializer([data], using=self.using):
+            model = type(deserialized.object)
+            self.buffers[model].append(deserialized)
+            if len(self.buffers[model]) >= self.batch_size:
+                self.flush(model)
+
+    def flush(self, model):
+        """Сохраняет пачку модели и всех моделей, от которых она зависит."""
+        with transaction.atomic(using=self.using):
+            for dependency in self.models[:self.models.index(model) + 1]:
+                buffer = self.buffers[dependency]
+                if buffer:
+                    self.insert(dependency, buffer)
+                    self.inserted_pks[dependency].extend(
+                        item.object.pk for item in buffer
+                    )
+                    self.report(dependency, len(buffer))
+                    self.buffers[dependency] = []
+        # При DEBUG соединение запоминает каждый запрос со всеми
+        # значениями, и за время загрузки журнал занял бы сотни мегабайт.
+        reset_queries()
+
+    def insert(self, model, deserialized):
+        objects = [item.object for item in deserialized]
+        if model is Post:
+            for post in objects:
+                post.fill_computed_fields()
+        insert_raw(model, objects, using=self.using)
+        for item in deserialized:
+            for name, values in (item.m2m_data or {}).items():
+                getattr(item.object, name).set(values)
+
+    def report(self, model, count):
+        before = sum(self.inserted.values())
+        self.inserted[model] += count
+        if before // PROGRESS_EVERY != (before + count) // PROGRESS_EVERY:
+            self.stderr.write(f'Загружено объектов: {before + count}')
+
+    def rollback(self):
+        """Удаляет объекты, сохранённые этой загрузкой.
+
+        Удаление идёт через ORM, чтобы каскадом ушли и объекты, которые
+        успели сослаться на загруженные, а сигналы сбросили кеши.
+        """
+        for model in reversed(self.models):
+            pks = self.inserted_pks[model]
+            for start in range(0, len(pks), DELETE_BATCH_SIZE):
+                model.objects.using(self.using).filter(
+                    pk__in=pks[start:start + DELETE_BATCH_SIZE]
+                ).delete()
+
+    def finish(self):
+        connection = connections[self.using]
+        connection.check_constraints(
+            table_names=[model._meta.db_table for model in self.models]
+        )
+        sequence_sql = connection.ops.sequence_reset_sql(
+            self.style, self.models
+        )
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
+        if self.inserted[Post] or self.inserted[Comment]:
+            Post.objects.using(self.using).recount_comments()
+        invalidate_post_counts()
+        invalidate_tags('all')
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, F, Max, Min, Q
+from django.utils import timezone
+
+from blog.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Показывает состояние очереди фоновых заданий по задачам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int, default=24,
+            help='За сколько часов учитывать завершённые задания.',
+        )
+        parser.add_argument(
+            '--purge-days', type=int, default=None,
+            help='Удалить выполненные задания старше этого числа дней.',
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        if options['purge_days'] is not None:
+            deleted, _ = Job.objects.filter(
+                status=Job.DONE,
+                finished_at__lt=now - timedelta(days=options['purge_days']),
+            ).delete()
+            self.stdout.write(f'Удалено выполненных заданий: {deleted}')
+
+        recent = Q(finished_at__gte=now - timedelta(hours=options['hours']))
+        stats = Job.objects.order_by().values('name').annotate(
+            queued=Count('pk', filter=Q(status=Job.QUEUED)),
+            running=Count('pk', filter=Q(status=Job.RUNNING)),
+            done=Count('pk', filter=Q(status=Job.DONE) & recent),
+            failed=Count('pk', filter=Q(status=Job.FAILED) & recent),
+            retried=Count('pk', filter=Q(attempts__gt=1) & recent),
+            oldest_queued=Min('run_after', filter=Q(status=Job.QUEUED)),
+            avg_duration=Avg(
+                F('finished_at') - F('started_at'),
+                filter=Q(status=Job.DONE) & recent,
+            ),
+            max_duration=Max(
+                F('finished_at') - F('started_at'),
+                filter=Q(status=Job.DONE) & recent,
+            ),
+        ).order_by('name')
+        for row in stats:
+            lag = (
+                max(now - row['oldest_queued'], timedelta(0))
+                if row['oldest_queued'] else timedelta(0)
+            )
+            self.stdout.write(
+                f'{row["name"]}: в очереди {row["queued"]} '
+                f'(ожидание до {lag.total_seconds():.0f} с), '
+                f'выполняется {row["running"]}, выполнено {row["done"]}, '
+                f'с ошибкой {row["failed"]}, с повторами {row["retried"]}, '
+                f'время среднее {self.seconds(row["avg_duration"])} с, '
+                f'наибольшее {self.seconds(row["max_duration"])} с'
+            )
+
+    def seconds(self, duration):
+        return f'{duration.total_seconds():.2f}' if duration else '—'
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from django.utils import timezone
+
+from blog.models import Post
+from blog.signals import posts_published
+
+
+class Command(BaseCommand):
+    help = (
+        'Выпускает в ленту отложенные публикации, когда наступает '
+        'их дата, и сбрасывает кеши затронутых страниц.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить одну проверку и завершиться.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=60,
+            help='Наибольшая пауза между проверками, в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.publish_due()
+            if options['once']:
+                return
+            try:
+                time.sleep(self.get_pause(options['interval']))
+            except KeyboardInterrupt:
+                return
+
+    def publish_due(self):
+        post_ids = Post.objects.publish_due()
+        if post_ids:
+            posts_published.send(sender=Post, post_ids=post_ids)
+            self.stdout.write(f'Выпущено публикаций: {len(post_ids)}')
+
+    def get_pause(self, interval):
+        """Спит до ближайшей отложенной публикации, но не дольше interval."""
+        next_pub_date = Post.objects.filter(is_live=False).aggregate(
+            next_pub_date=Min('pub_date')
+        )['next_pub_date']
+        if next_pub_date is None:
+            return interval
+        pause = (next_pub_date - timezone.now()).total_seconds()
+        return min(max(pause, 0), interval)
@@ -0,0 +1,62 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from blog.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет фоновые задания из базы. Останавливается по SIGINT '
+        'или SIGTERM, дождавшись текущих заданий.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Сколько заданий выполнять одновременно.',
+        )
+        parser.add_argument(
+            '--visibility-timeout', type=int, default=None,
+            help='Через сколько секунд задание без отчёта исполнителя '
+            'снова становится доступным; по умолчанию '
+            'JOB_VISIBILITY_TIMEOUT.',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза между проверками пустой очереди, в секундах.',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Завершиться, когда доступных заданий не останется.',
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options['concurrency'],
+            visibility_timeout=options['visibility_timeout'],
+            poll_interval=options['poll_interval'],
+            burst=options['burst'],
+        )
+        previous = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                previous[signum] = signal.signal(
+                    signum, lambda *args: worker.stop()
+                )
+        try:
+            metrics = worker.run()
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.stdout.write(
+            'Заданий выполнено: {done}, отложено для повтора: {queued}, '
+            'с ошибкой: {failed}, перехвачено другими: {lost}'.format(
+                **{
+                    status: metrics[status]
+                    for status in ('done', 'queued', 'failed', 'lost')
+                }
+            )
+        )
@@ -0,0 +1,199 @@
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+
+from blog.caching import invalidate_tags
+from blog.db import insert_raw
+from blog.models import Category, Comment, Location, Post, User
+from blog.paginators import invalidate_post_counts
+
+SEED_PASSWORD = 'seed-password'
+SENTENCE_POOL_SIZE = 2000
+# Параметр распределения Парето: чем меньше, тем сильнее перекос,
+# когда немногие авторы, категории и посты собирают большую часть
+# публикаций и комментариев.
+SKEW = 1.16
+
+
+def skewed_weights(count, rng):
+    """Накопленные веса для random.choices: выбор за O(log n)."""
+    return list(accumulate(rng.paretovariate(SKEW) for _ in range(count)))
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими данными с перекосом, похожим на '
+        'реальный: несколько активных авторов, популярные категории и '
+        'обсуждаемые посты. Например: --users 10000 --posts 1000000 '
+        '--comments 10000000.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=100000)
+        parser.add_argument(
+            '--days', type=int, default=3 * 365,
+            help='За сколько дней назад распределяются даты публикаций.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.sentences = [
+            self.faker.sentence() for _ in range(SENTENCE_POOL_SIZE)
+        ]
+
+        users = self.create_users(options['users'])
+        categories = self.create_categories(options['categories'])
+        locations = self.create_locations(options['locations'])
+        posts = self.create_posts(
+            options['posts'], options['days'], users, categories, locations
+        )
+        self.create_comments(options['comments'], posts, users)
+
+        Post.objects.filter(pk__gte=posts['first_id']).recount_comments()
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        invalidate_post_counts()
+        invalidate_tags('all')
+        self.stdout.write(self.style.SUCCESS('Данные созданы.'))
+
+    def next_id(self, model):
+        return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+    def insert(self, model, objects):
+        with transaction.atomic():
+            insert_raw(model, objects)
+
+    def create_in_batches(self, model, total, build):
+        first_id = self.next_id(model)
+        for start in range(0, total, self.batch_size):
+            stop = min(start + self.batch_size, total)
+            self.insert(model, [
+                build(first_id + number, number)
+                for number in range(start, stop)
+            ])
+            self.stderr.write(f'{model._meta.label}: {stop} из {total}')
+        return list(range(first_id, first_id + total))
+
+    def text(self, min_sentences, max_sentences):
+        return ' '.join(self.rng.choices(
+            self.sentences,
+            k=self.rng.randint(min_sentences, max_sentences),
+        ))
+
+    def create_users(self, total):
+        password = make_password(SEED_PASSWORD)
+        return self.create_in_batches(User, total, lambda pk, number: User(
+            pk=pk,
+            username=f'{self.faker.user_name()}_{pk}',
+            first_name=self.faker.first_name(),
+            last_name=self.faker.last_name(),
+            email=f'user{pk}@example.com',
+            password=password,
+            date_joined=self.now,
+        ))
+
+    def create_categories(self, total):
+        return self.create_in_batches(
+            Category, total, lambda pk, number: Category(
+                pk=pk,
+                title=self.faker.sentence(nb_words=3)[:-1],
+                slug=f'category-{pk}',
+                description=self.text(1, 3),
+                # Каждая двадцатая категория снята с публикации.
+                is_published=number % 20 != 19,
+            )
+        )
+
+    def create_locations(self, total):
+        return self.create_in_batches(
+            Location, total, lambda pk, number: Location(
+                pk=pk,
+                name=self.faker.city(),
+                is_published=number % 10 != 9,
+            )
+        )
+
+    def create_posts(self, total, days, users, categories, locations):
+        author_weights = skewed_weights(len(users), self.rng)
+        category_weights = skewed_weights(len(categories), self.rng)
+        pub_dates = []
+
+        def build(pk, number):
+            # Недавних публикаций больше, а 1% запланирован на будущее.
+            if self.rng.random() < 0.01:
+                pub_date = self.now + timedelta(
+                    days=self.rng.uniform(0, 30)
+                )
+            else:
+                pub_date = self.now - timedelta(
+                    days=days * self.rng.random() ** 2
+                )
+            pub_dates.append(pub_date)
+            has_location = locations and self.rng.random() < 0.8
+            post = Post(
+                pk=pk,
+                title=self.faker.sentence(nb_words=5)[:-1],
+                text=self.text(3, 30),
+                pub_date=pub_date,
+                created_at=min(pub_date, self.now),
+                is_published=self.rng.random() < 0.97,
+                author_id=self.rng.choices(
+                    users, cum_weights=author_weights
+                )[0],
+                category_id=self.rng.choices(
+                    categories, cum_weights=category_weights
+                )[0] if categories else None,
+                location_id=(
+                    self.rng.choice(locations) if has_location else None
+                ),
+            )
+            post.fill_computed_fields()
+            return post
+
+        post_ids = self.create_in_batches(Post, total, build)
+        return {
+            'ids': post_ids,
+            'pub_dates': pub_dates,
+            'first_id': post_ids[0] if post_ids else self.next_id(Post),
+        }
+
+    def create_comments(self, total, posts, users):
+        if not posts['ids']:
+            return
+        post_weights = skewed_weights(len(posts['ids']), self.rng)
+        indexes = range(len(posts['ids']))
+
+        def build(pk, number):
+            index = self.rng.choices(indexes, cum_weights=post_weights)[0]
+            created_at = min(
+                posts['pub_dates'][index]
+                + timedelta(hours=self.rng.expovariate(1 / 48)),
+                self.now,
+            )
+            return Comment(
+                pk=pk,
+                post_id=posts['ids'][index],
+                author_id=self.rng.choice(users),
+                text=self.text(1, 4),
+                created_at=created_at,
+            )
+
+        self.create_in_batches(Comment, total, build)
@@ -0,0 +1,66 @@
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.slow_queries import normalize_sql
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводка журнала медленных запросов: отпечатки запросов '
+        'по убыванию суммарного времени.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', help='Журнал; по умолчанию SLOW_QUERY_LOG_FILE.'
+        )
+        parser.add_argument('--limit', type=int, default=20)
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.SLOW_QUERY_LOG_FILE
+        groups = {}
+        try:
+            with open(path, encoding='utf-8') as log:
+                for line in log:
+                    if line.strip():
+                        self.add(groups, json.loads(line))
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Не удалось прочитать журнал: {error}')
+
+        ranked = sorted(
+            groups.items(), key=lambda item: item[1]['total_ms'], reverse=True
+        )
+        for fingerprint, group in ranked[:options['limit']]:
+            routes = ', '.join(
+                f'{route or "вне запроса"} ×{count}'
+                for route, count in group['routes'].most_common(3)
+            )
+            self.stdout.write(
+                f'{fingerprint}  всего {group["total_ms"]:.0f} мс, '
+                f'{group["count"]} раз, в среднем '
+                f'{group["total_ms"] / group["count"]:.1f} мс, '
+                f'максимум {group["max_ms"]:.1f} мс\n'
+                f'  маршруты: {routes}\n'
+                f'  {normalize_sql(group["sql"])}'
+            )
+            for row in group['plan']:
+                self.stdout.write(f'    {row}')
+
+    def add(self, groups, record):
+        group = groups.setdefault(record['fingerprint'], {
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'routes': Counter(),
+            'sql': record['sql'],
+            'plan': record['plan'],
+        })
+        group['count'] += 1
+        group['total_ms'] += record['duration_ms']
+        if record['duration_ms'] > group['max_ms']:
+            group['max_ms'] = record['duration_ms']
+            group['plan'] = record['plan']
+        group['routes'][record['route']] += 1
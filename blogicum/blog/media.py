@@ -0,0 +1,153 @@
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .storage import get_blob_digest
+
+# Форматы копий фото, которых нет в старых таблицах mimetypes.
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('image/avif', '.avif')
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def get_range(header, size):
+    """Границы одного диапазона из заголовка Range.
+
+    Возвращает None, если заголовок нужно проигнорировать и отдать
+    файл целиком (в том числе для нескольких диапазонов), и ValueError,
+    если диапазон не пересекается с файлом.
+    """
+    match = RANGE.match(header.replace(' ', ''))
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def read_range(file, start, length):
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def range_applies(request, etag, last_modified):
+    """Проверка If-Range: диапазон отдаётся только для той же версии."""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(last_modified)
+
+
+def sendfile_response(name, path):
+    response = HttpResponse()
+    if settings.MEDIA_SENDFILE_HEADER == 'X-Accel-Redirect':
+        response['X-Accel-Redirect'] = quote(
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + name
+        )
+    else:
+        response[settings.MEDIA_SENDFILE_HEADER] = path
+    # Длину и тип ответа выставит веб-сервер.
+    del response['Content-Type']
+    return response
+
+
+def file_response(request, path, size, etag, last_modified):
+    requested = request.META.get('HTTP_RANGE')
+    if requested and range_applies(request, etag, last_modified):
+        try:
+            byte_range = get_range(requested, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range is not None:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                read_range(open(path, 'rb'), start, end - start + 1),
+                status=206,
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = end - start + 1
+            return response
+    # FileResponse отдаёт файл через wsgi.file_wrapper, то есть
+    # sendfile(), если сервер его поддерживает.
+    return FileResponse(open(path, 'rb'))
+
+
+@require_safe
+def serve_media(request, path):
+    """Отдаёт файл из MEDIA_ROOT.
+
+    Поддерживает условные запросы и диапазоны байтов. Файлы с хешем
+    содержимого в имени кешируются навсегда. Если задан
+    MEDIA_SENDFILE_HEADER, сам файл отдаёт веб-сервер.
+    """
+    if any(part.startswith('.') for part in path.split('/')):
+        raise Http404
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        file_stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404
+
+    digest = get_blob_digest(path)
+    etag = (
+        f'"{digest}"' if digest
+        else f'"{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"'
+    )
+    last_modified = file_stat.st_mtime
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified)
+    )
+    if response is None:
+        if settings.MEDIA_SENDFILE_HEADER:
+            response = sendfile_response(path, full_path)
+        else:
+            response = file_response(
+                request, full_path, file_stat.st_size, etag, last_modified
+            )
+        content_type, encoding = mimetypes.guess_type(path)
+        if content_type and response.status_code != 416:
+            response['Content-Type'] = content_type
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = (
+        IMMUTABLE if digest else f'public, max-age={settings.MEDIA_MAX_AGE}'
+    )
+    return response
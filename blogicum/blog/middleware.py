@@ -0,0 +1,139 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from .slow_queries import current_route
+
+logger = logging.getLogger('blog.timing')
+
+
+class CurrentRouteMiddleware:
+    """Делает имя маршрута запроса доступным журналу медленных запросов."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_route.set(None)
+        try:
+            return self.get_response(request)
+        finally:
+            current_route.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        current_route.set(request.resolver_match.view_name)
+
+
+class RequestTiming:
+    """Счётчики одного запроса: SQL, отрисовка шаблона и время view."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.render_started = None
+        self.render_time = 0.0
+        self.wrappers = ExitStack()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.db_queries += 1
+
+    def start_render(self, response):
+        self.render_started = time.perf_counter()
+
+    def finish_render(self, response):
+        self.render_time = time.perf_counter() - self.render_started
+
+
+class ServerTimingMiddleware:
+    """Замеряет запросы к базе, отрисовку шаблона и время view.
+
+    Замеры пишутся строкой JSON в журнал `blog.timing`, а заголовком
+    Server-Timing отдаются при DEBUG, сотрудникам или всем, если
+    включён SERVER_TIMING_PUBLIC. Доля замеряемых запросов задаётся для каждого
+    маршрута в SERVER_TIMING_ROUTE_SAMPLE_RATES, для остальных —
+    SERVER_TIMING_SAMPLE_RATE; в незамеряемых запросах счётчики
+    не подключаются вовсе.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        request.timing = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request.timing is not None:
+                request.timing.wrappers.close()
+        if request.timing is not None:
+            self.report(request, response, request.timing, started)
+        return response
+
+    def get_sample_rate(self, view_name):
+        return settings.SERVER_TIMING_ROUTE_SAMPLE_RATES.get(
+            view_name, settings.SERVER_TIMING_SAMPLE_RATE
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        rate = self.get_sample_rate(request.resolver_match.view_name)
+        if not rate or random.random() >= rate:
+            return None
+        request.timing = RequestTiming()
+        for connection in connections.all():
+            request.timing.wrappers.enter_context(
+                connection.execute_wrapper(request.timing)
+            )
+        return None
+
+    def process_template_response(self, request, response):
+        if request.timing is not None:
+            request.timing.start_render(response)
+            response.add_post_render_callback(request.timing.finish_render)
+        return response
+
+    def show_header(self, request, response):
+        if settings.SERVER_TIMING_PUBLIC or settings.DEBUG:
+            return True
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_staff:
+            return False
+        # Ответ сотруднику не должен достаться из общего кеша другим.
+        patch_vary_headers(response, ['Cookie'])
+        return True
+
+    def report(self, request, response, timing, started):
+        finished = time.perf_counter()
+        metrics = {
+            'db_queries': timing.db_queries,
+            'db_ms': round(timing.db_time * 1000, 2),
+            'render_ms': round(timing.render_time * 1000, 2),
+            'view_ms': round((finished - timing.started) * 1000, 2),
+            'total_ms': round((finished - started) * 1000, 2),
+        }
+        if self.show_header(request, response):
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={metrics["db_ms"]};desc="{timing.db_queries} SQL"',
+                f'tpl;dur={metrics["render_ms"]}',
+                f'view;dur={metrics["view_ms"]}',
+                f'total;dur={metrics["total_ms"]}',
+            ])
+        logger.info(json.dumps({
+            'route': request.resolver_match.view_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **metrics,
+        }))
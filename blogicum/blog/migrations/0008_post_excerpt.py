@@ -0,0 +1,34 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:30
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def make_excerpt(text, max_length):
+    """Копия blog.utils.make_excerpt на момент этой миграции."""
+    excerpt = Truncator(text).words(10, truncate=' …')
+    return Truncator(excerpt).chars(max_length)
+
+
+def fill_excerpt(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.only('pk', 'text')
+    for post in posts.iterator(chunk_size=1000):
+        post.excerpt = make_excerpt(post.text, 256)
+        post.save(update_fields=['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_comment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=256, verbose_name='Начало текста'),
+        ),
+        migrations.RunPython(fill_excerpt, migrations.RunPython.noop),
+    ]
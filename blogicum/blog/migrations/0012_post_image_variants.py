@@ -0,0 +1,78 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:09
+
+from django.db import migrations, models
+
+SEARCH_TABLE = 'blog_post_fts'
+
+# Схема поискового индекса на момент этой миграции.
+CREATE_SEARCH_INDEX = [
+    f'''
+    CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+        title, text,
+        content='blog_post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    ''',
+    f'''
+    CREATE TRIGGER blog_post_fts_insert AFTER INSERT ON blog_post BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER blog_post_fts_delete AFTER DELETE ON blog_post BEGIN
+        INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER blog_post_fts_update AFTER UPDATE OF title, text
+    ON blog_post BEGIN
+        INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO {SEARCH_TABLE} (rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    ''',
+    f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')",
+]
+
+DROP_SEARCH_INDEX = [
+    'DROP TRIGGER IF EXISTS blog_post_fts_insert',
+    'DROP TRIGGER IF EXISTS blog_post_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_post_fts_update',
+    f'DROP TABLE IF EXISTS {SEARCH_TABLE}',
+]
+
+
+def rebuild_search_index(apps, schema_editor):
+    """Копия blog.search.rebuild_search_index на момент этой миграции.
+
+    SQLite пересоздаёт таблицу blog_post при изменении её схемы, и
+    триггеры поискового индекса при этом удаляются.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in [*DROP_SEARCH_INDEX, *CREATE_SEARCH_INDEX]:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop, rebuild_search_index
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Уменьшенные копии фото'),
+        ),
+        migrations.RunPython(
+            rebuild_search_index, migrations.RunPython.noop
+        ),
+    ]
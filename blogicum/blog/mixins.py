@@ -1,9 +1,104 @@
+import hashlib
+import time
+from http import HTTPStatus
+
+from django.conf import settings
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.core.cache import cache
+from django.http import Http404
 from django.shortcuts import redirect
 from django.urls import reverse_lazy, reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
 
+from .caching import get_page_cache_key, get_tag_versions
 from .models import Comment
 from .forms import CommentForm
+from .paginators import CachedCountPaginator, CursorPaginator, InvalidCursor
+from .utils import cached_for_request
+
+PAGE_RANGE_ON_EACH_SIDE = 3
+PAGE_RANGE_ON_ENDS = 1
+
+
+class AnonymousPageCacheMixin:
+    """Кеширует готовую страницу для анонимных посетителей.
+
+    Ключ страницы включает версии тегов из `get_cache_tags()`, которые
+    сбрасываются сигналами при изменении показанных на ней объектов.
+    Из строки запроса в ключ входят только `cache_query_params`.
+    """
+
+    cache_query_params = ('page', 'cursor')
+
+    def get_cache_tags(self):
+        return ['all']
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key = get_page_cache_key(
+            request, self.get_cache_tags(), self.cache_query_params
+        )
+        response = cache.get(key)
+        if response is not None:
+            return get_conditional_response(
+                request,
+                etag=response.get('ETag'),
+                last_modified=parse_http_date_safe(
+                    response.get('Last-Modified', '')
+                ),
+                response=response,
+            )
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == HTTPStatus.OK:
+            timeout = settings.PAGE_CACHE_TIMEOUT
+            if getattr(response, 'is_rendered', True):
+                cache.set(key, response, timeout)
+            else:
+                response.add_post_render_callback(
+                    lambda response: cache.set(key, response, timeout)
+                )
+        return response
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 Not Modified, пока страница не менялась.
+
+    Валидаторы строятся до обращения к базе по версиям тегов страницы
+    из `get_cache_tags()` — тех же, что сбрасываются при изменении
+    показанных на ней объектов. Версия тега — время последнего сброса
+    и только растёт, поэтому Last-Modified не откатывается назад, когда
+    публикация удаляется, скрывается или уходит со страницы.
+    """
+
+    def get_etag_parts(self):
+        return [self.request.user.pk]
+
+    def get_validators(self):
+        versions = get_tag_versions(self.get_cache_tags())
+        parts = [*self.get_etag_parts(), *versions]
+        etag = hashlib.md5(repr(parts).encode()).hexdigest()
+        # Last-Modified точен до секунды: изменение в ту же секунду
+        # его не сдвинет, поэтому заголовок отдаётся, только когда
+        # секунда последнего изменения уже прошла.
+        last_modified = max(versions) // 10 ** 9
+        if last_modified >= int(time.time()):
+            last_modified = None
+        return quote_etag(etag), last_modified
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ['Cookie'])
+        return response
 
 
 class CommentMixin:
@@ -18,10 +113,79 @@ class CommentMixin:
         )
 
 
+class CachedCountPaginationMixin:
+    """Берёт количество публикаций списка из кеша."""
+
+    paginator_class = CachedCountPaginator
+
+    def get_count_key(self):
+        return None
+
+    def get_paginator(self, *args, **kwargs):
+        return super().get_paginator(
+            *args, count_key=self.get_count_key(), **kwargs
+        )
+
+
+class CursorPaginationMixin:
+    """Keyset-пагинация списка по `cursor` из строки запроса.
+
+    Ссылки вида `?page=N` по-прежнему обслуживает обычный пагинатор.
+    """
+
+    cursor_kwarg = 'cursor'
+    cursor_ordering = ('-pub_date', '-id')
+
+    def use_cursor_pagination(self):
+        if self.cursor_kwarg in self.request.GET:
+            return True
+        page_requested = (
+            self.page_kwarg in self.kwargs
+            or self.page_kwarg in self.request.GET
+        )
+        return (
+            not page_requested
+            and settings.POSTS_PAGINATION_MODE == 'cursor'
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(
+            queryset, page_size, ordering=self.cursor_ordering
+        )
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class ElidedPageRangeMixin:
+    """Передаёт в шаблон сокращённый список номеров страниц."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get('page_obj')
+        if page is not None and not getattr(page, 'is_cursor', False):
+            context['page_range'] = list(
+                page.paginator.get_elided_page_range(
+                    page.number,
+                    on_each_side=PAGE_RANGE_ON_EACH_SIDE,
+                    on_ends=PAGE_RANGE_ON_ENDS,
+                )
+            )
+        return context
+
+
 class OnlyAuthorMixin(UserPassesTestMixin):
+    @cached_for_request
+    def get_object(self, queryset=None):
+        return super().get_object(queryset)
+
     def test_func(self):
         object = self.get_object()
-        return object.author == self.request.user
+        return object.author_id == self.request.user.pk
 
     def handle_no_permission(self):
         return redirect(
@@ -1,11 +1,74 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .images import (
+    get_sources, get_srcset, iter_variant_names, make_variants
+)
+from .search import SEARCH_TABLE, get_search_terms, make_match_query
+from .storage import post_image_storage
+from .utils import make_excerpt
 
 User = get_user_model()
 
 MAX_LENGTH_CHAR_FIELD = 256
 
 
+class PostQuerySet(models.QuerySet):
+
+    def recount_comments(self):
+        """Пересчитывает сохранённое количество комментариев."""
+        comments = Comment.objects.filter(
+            post=models.OuterRef('pk')
+        ).order_by().values('post').annotate(
+            total=models.Count('pk')
+        ).values('total')
+        return self.update(
+            comment_count=Coalesce(models.Subquery(comments), 0)
+        )
+
+    def publish_due(self, now=None):
+        """Выпускает в ленту отложенные публикации, чей срок наступил.
+
+        Возвращает идентификаторы выпущенных публикаций.
+        """
+        due = self.filter(is_live=False, pub_date__lte=now or timezone.now())
+        post_ids = list(due.values_list('pk', flat=True))
+        if post_ids:
+            self.filter(pk__in=post_ids).update(
+                is_live=True, updated_at=timezone.now()
+            )
+        return post_ids
+
+    def search(self, query):
+        """Публикации, подходящие под запрос, от наиболее релевантных.
+
+        В SQLite поиск идёт по индексу FTS5 с ранжированием bm25,
+        в остальных базах — по вхождению каждого слова.
+        """
+        terms = get_search_terms(query)
+        if not terms:
+            return self.none()
+        if connections[self.db].vendor != 'sqlite':
+            queryset = self
+            for term in terms:
+                queryset = queryset.filter(
+                    models.Q(title__icontains=term)
+                    | models.Q(text__icontains=term)
+                )
+            return queryset.order_by('-pub_date')
+        return self.extra(
+            select={'search_rank': f'bm25({SEARCH_TABLE}, 10.0, 1.0)'},
+            tables=[SEARCH_TABLE],
+            where=[
+                f'{SEARCH_TABLE}.rowid = blog_post.id',
+                f'{SEARCH_TABLE} MATCH %s',
+            ],
+            params=[make_match_query(query)],
+        ).order_by('search_rank', '-pub_date')
+
+
 class BaseModel(models.Model):
     """Абстрактная модель. Добвляет флаг is_published и дату."""
 
@@ -33,11 +96,22 @@ class Post(BaseModel):
     text = models.TextField(
         verbose_name='Текст',
     )
+    excerpt = models.CharField(
+        verbose_name='Начало текста',
+        max_length=MAX_LENGTH_CHAR_FIELD,
+        blank=True,
+        editable=False,
+    )
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
         help_text='Если установить дату и время в будущем — '
         'можно делать отложенные публикации.',
     )
+    is_live = models.BooleanField(
+        verbose_name='Дата публикации наступила',
+        default=False,
+        editable=False,
+    )
     author = models.ForeignKey(
         User,
         verbose_name='Автор публикации',
@@ -59,16 +133,135 @@ class Post(BaseModel):
         on_delete=models.SET_NULL,
         null=True,
     )
-    image = models.ImageField('Фото', upload_to='post_images', blank=True)
+    image = models.ImageField(
+        'Фото',
+        upload_to='post_images',
+        storage=post_image_storage,
+        blank=True,
+    )
+    image_variants = models.JSONField(
+        verbose_name='Уменьшенные копии фото',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    updated_at = models.DateTimeField(
+        verbose_name='Изменено',
+        auto_now=True,
+    )
+
+    objects = PostQuerySet.as_manager()
+
+    # Поля, которые save() не перезаписывает при обновлении: их меняют
+    # только атомарные UPDATE — сигналы комментариев и
+    # update_image_variants. Иначе экземпляр, загруженный раньше
+    # (форма, админка), вернул бы устаревшие значения.
+    COUNTER_FIELDS = ('comment_count', 'image_variants')
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', 'is_published', 'is_live'],
+                name='post_feed_idx',
+            ),
+            models.Index(
+                fields=['category', '-pub_date', 'is_published', 'is_live'],
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date'],
+                name='post_author_feed_idx',
+            ),
+            models.Index(
+                fields=['pub_date'],
+                condition=models.Q(is_live=False),
+                name='post_scheduled_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    def fill_computed_fields(self):
+        """Заполняет поля, которые выводятся из текста и даты."""
+        self.excerpt = make_excerpt(self.text, MAX_LENGTH_CHAR_FIELD)
+        self.is_live = self.pub_date <= timezone.now()
+
+    def save(self, *args, **kwargs):
+        self.fill_computed_fields()
+        if (
+            not self._state.adding and self.pk is not None
+            and kwargs.get('update_fields') is None
+        ):
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def image_variants_outdated(self):
+        source = self.image.name if self.image else ''
+        return self.image_variants.get('source', '') != source
+
+    def update_image_variants(self, force=False):
+        """Создаёт уменьшенные копии нового фото.
+
+        Копии того же фото у другой публикации используются повторно.
+        Файлы прежних копий удаляет collect_image_blobs, когда на них
+        не остаётся ссылок.
+        """
+        source = self.image.name if self.image else ''
+        if not force and not self.image_variants_outdated:
+            return False
+        previous = list(iter_variant_names(self.image_variants))
+        shared = None
+        if source and not force:
+            shared = Post.objects.filter(
+                image=source, image_variants__source=source
+            ).exclude(pk=self.pk).values_list(
+                'image_variants', flat=True
+            ).first()
+        self.image_variants = (
+            shared or (make_variants(self.image) if source else {})
+        )
+        with transaction.atomic():
+            updated = Post.objects.filter(pk=self.pk).update(
+                image_variants=self.image_variants,
+                updated_at=timezone.now(),
+            )
+            if updated:
+                ImageBlob.objects.retain(
+                    iter_variant_names(self.image_variants)
+                )
+                ImageBlob.objects.release(previous)
+        return True
+
+    @property
+    def image_blob_names(self):
+        """Имена всех файлов фото публикации вместе с копиями."""
+        names = list(iter_variant_names(self.image_variants))
+        if self.image:
+            names.append(self.image.name)
+        return names
+
+    @property
+    def image_srcset(self):
+        return get_srcset(self.image, self.image_variants)
+
+    @property
+    def image_sources(self):
+        return get_sources(self.image, self.image_variants)
+
 
 class Category(BaseModel):
     """Категория"""
@@ -131,8 +324,237 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created_at',)
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at'],
+                name='comment_post_created_idx',
+            ),
+        ]
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self):
         return self.text
+
+
+class JobQuerySet(models.QuerySet):
+
+    def due(self, now=None):
+        """Задания, которые можно взять в работу.
+
+        Кроме ждущих своей очереди, сюда попадают выполняемые задания,
+        чей исполнитель не отчитался до истечения блокировки.
+        """
+        now = now or timezone.now()
+        return self.filter(
+            models.Q(status=Job.QUEUED, run_after__lte=now)
+            | models.Q(status=Job.RUNNING, locked_until__lt=now)
+        )
+
+
+class Job(models.Model):
+    """Фоновое задание"""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнено'),
+        (FAILED, 'Ошибка'),
+    ]
+
+    name = models.CharField(
+        verbose_name='Задача',
+        max_length=MAX_LENGTH_CHAR_FIELD,
+    )
+    payload = models.JSONField(
+        verbose_name='Аргументы',
+        default=dict,
+        blank=True,
+    )
+    key = models.CharField(
+        verbose_name='Ключ',
+        max_length=MAX_LENGTH_CHAR_FIELD,
+        blank=True,
+        help_text='Пока задание с этим ключом ждёт в очереди, '
+        'такое же не добавляется.',
+    )
+    status = models.CharField(
+        verbose_name='Состояние',
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток',
+        default=0,
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='Наибольшее число попыток',
+        default=5,
+    )
+    run_after = models.DateTimeField(
+        verbose_name='Выполнить после',
+        default=timezone.now,
+    )
+    locked_by = models.CharField(
+        verbose_name='Исполнитель',
+        max_length=MAX_LENGTH_CHAR_FIELD,
+        blank=True,
+    )
+    locked_until = models.DateTimeField(
+        verbose_name='Занято до',
+        null=True,
+        blank=True,
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True,
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Добавлено',
+        auto_now_add=True,
+    )
+    started_at = models.DateTimeField(
+        verbose_name='Начато',
+        null=True,
+        blank=True,
+    )
+    finished_at = models.DateTimeField(
+        verbose_name='Завершено',
+        null=True,
+        blank=True,
+    )
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'фоновое задание'
+        verbose_name_plural = 'Фоновые задания'
+        ordering = ('run_after',)
+        indexes = [
+            models.Index(
+                fields=['status', 'run_after'],
+                name='job_due_idx',
+            ),
+            models.Index(
+                fields=['status', 'locked_until'],
+                name='job_locked_idx',
+            ),
+            models.Index(
+                fields=['key'],
+                condition=models.Q(status='queued') & ~models.Q(key=''),
+                name='job_queued_key_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
+
+
+class ImageBlobQuerySet(models.QuerySet):
+
+    def retain(self, names):
+        """Добавляет по ссылке на каждый файл, создавая недостающие."""
+        names = set(names)
+        if not names:
+            return
+        self.bulk_create(
+            [
+                ImageBlob(name=name, size=ImageBlob.get_file_size(name))
+                for name in names
+            ],
+            ignore_conflicts=True,
+        )
+        self.filter(name__in=names).update(
+            refcount=models.F('refcount') + 1,
+            updated_at=timezone.now(),
+        )
+
+    def release(self, names):
+        """Убирает по ссылке на каждый файл."""
+        names = set(names)
+        if names:
+            self.filter(name__in=names).update(
+                refcount=Greatest(models.F('refcount') - 1, 0),
+                updated_at=timezone.now(),
+            )
+
+    def recount(self):
+        """Пересчитывает ссылки по всем публикациям.
+
+        Возвращает число файлов, у которых счётчик разошёлся с данными.
+        """
+        counts = {}
+        posts = Post.objects.values_list('image', 'image_variants')
+        for image, image_variants in posts.iterator():
+            names = set(iter_variant_names(image_variants))
+            if image:
+                names.add(image)
+            for name in names:
+                counts[name] = counts.get(name, 0) + 1
+        self.bulk_create(
+            [
+                ImageBlob(name=name, size=ImageBlob.get_file_size(name))
+                for name in counts
+            ],
+            ignore_conflicts=True,
+        )
+        changed = [
+            blob for blob in self.only('pk', 'name', 'refcount').iterator()
+            if blob.refcount != counts.get(blob.name, 0)
+        ]
+        now = timezone.now()
+        for blob in changed:
+            blob.refcount = counts.get(blob.name, 0)
+            blob.updated_at = now
+        self.bulk_update(changed, ['refcount', 'updated_at'], batch_size=500)
+        return len(changed)
+
+
+class ImageBlob(models.Model):
+    """Файл фото в хранилище с адресацией по содержимому"""
+
+    name = models.CharField(
+        verbose_name='Имя файла',
+        max_length=MAX_LENGTH_CHAR_FIELD,
+        unique=True,
+    )
+    size = models.PositiveBigIntegerField(
+        verbose_name='Размер, байт',
+        default=0,
+    )
+    refcount = models.PositiveIntegerField(
+        verbose_name='Число ссылок',
+        default=0,
+    )
+    updated_at = models.DateTimeField(
+        verbose_name='Изменено',
+        auto_now=True,
+    )
+
+    objects = ImageBlobQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'файл фото'
+        verbose_name_plural = 'Файлы фото'
+        indexes = [
+            models.Index(
+                fields=['updated_at'],
+                condition=models.Q(refcount=0),
+                name='imageblob_unused_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def get_file_size(name):
+        try:
+            return post_image_storage.size(name)
+        except OSError:
+            return 0
@@ -0,0 +1,244 @@
+import base64
+import binascii
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import Max, Q
+from django.utils.functional import cached_property
+
+POSTS_COUNT_VERSION_KEY = 'posts-count-version'
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CursorPage:
+    """Страница keyset-пагинации: без номера и без подсчёта строк."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Постраничный вывод по ключу сортировки вместо OFFSET.
+
+    Курсор хранит значения полей сортировки крайнего объекта страницы,
+    поэтому выборка любой страницы — это индексный поиск по условию
+    «строго после курсора» с LIMIT, а не пропуск предыдущих строк.
+    """
+
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def page(self, cursor=None):
+        direction, values = self.decode_cursor(cursor)
+        queryset = self.queryset
+        ordering = self.ordering
+        if direction == self.PREVIOUS:
+            ordering = tuple(self._reverse(name) for name in ordering)
+        if values is not None:
+            queryset = queryset.filter(self._after(ordering, values))
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if direction == self.PREVIOUS:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode_cursor(rows[-1], self.NEXT)
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(rows[0], self.PREVIOUS)
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+    def encode_cursor(self, obj, direction):
+        values = [
+            self._field(name).value_to_string(obj) for name in self.fields
+        ]
+        payload = json.dumps([direction, values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return self.NEXT, None
+        try:
+            payload = base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4)
+            )
+            direction, raw_values = json.loads(payload)
+            if (
+                direction not in (self.NEXT, self.PREVIOUS)
+                or len(raw_values) != len(self.fields)
+            ):
+                raise ValueError
+            values = [
+                self._field(name).to_python(value)
+                for name, value in zip(self.fields, raw_values)
+            ]
+        except (
+            binascii.Error, TypeError, ValueError, ValidationError
+        ) as error:
+            raise InvalidCursor('Некорректный курсор') from error
+        return direction, values
+
+    def _field(self, name):
+        return self.queryset.model._meta.get_field(name)
+
+    @staticmethod
+    def _reverse(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    def _after(self, ordering, values):
+        condition = Q()
+        for index, name in enumerate(ordering):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            step = Q(**{f'{field}__{lookup}': values[index]})
+            for previous, value in zip(self.fields[:index], values):
+                step &= Q(**{previous: value})
+            condition |= step
+        return condition
+
+
+def invalidate_post_counts():
+    """Сбрасывает все закешированные количества публикаций.
+
+    Версия — текущее время, а не incr: в файловом кеше incr не атомарен,
+    а новое время отличается от прежней версии и при гонке сбросов.
+    """
+    cache.set(POSTS_COUNT_VERSION_KEY, time.time_ns(), None)
+
+
+def estimate_count(queryset):
+    """Грубая оценка числа строк таблицы без полного подсчёта."""
+    model = queryset.model
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone():
+                cursor.execute(
+                    'SELECT stat FROM sqlite_stat1 WHERE tbl = %s',
+                    [model._meta.db_table],
+                )
+                row = cursor.fetchone()
+                if row:
+                    return int(row[0].split()[0])
+    return model._default_manager.using(queryset.db).aggregate(
+        last=Max('pk')
+    )['last'] or 0
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор, кеширующий количество объектов по ключу фильтра.
+
+    Кеш живёт POSTS_COUNT_CACHE_TIMEOUT секунд и сбрасывается
+    при публикации, снятии с публикации и удалении постов. Для выборки
+    без условий больше POSTS_COUNT_ESTIMATE_THRESHOLD объектов берётся
+    оценка по таблице. Отфильтрованный список считается точно, но если
+    он больше порога, то после сброса кеша количество пересчитывает
+    один запрос, а остальные тем временем получают прежнее значение.
+    """
+
+    def __init__(self, *args, count_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return self._count()
+        version = cache.get_or_set(POSTS_COUNT_VERSION_KEY, time.time_ns, None)
+        key = f'posts-count:{version}:{self.count_key}'
+        count = cache.get(key)
+        if count is None:
+            count = self._count()
+            cache.set(key, count, settings.POSTS_COUNT_CACHE_TIMEOUT)
+        return count
+
+    def _count(self):
+        threshold = settings.POSTS_COUNT_ESTIMATE_THRESHOLD
+        if not threshold or not hasattr(self.object_list, 'query'):
+            return super().count
+        if self.object_list.query.where:
+            return self._filtered_count(threshold)
+        count = self.object_list[:threshold + 1].count()
+        if count <= threshold:
+            return count
+        return max(estimate_count(self.object_list), count)
+
+    def _filtered_count(self, threshold):
+        """Точное количество отфильтрованного списка одним запросом.
+
+        Пробный подсчёт с LIMIT делается, только пока список не известен
+        как большой. Для большого списка пересчитывает один запрос,
+        остальные получают последнее точное значение.
+        """
+        last_key = f'posts-count-last:{self.count_key}'
+        lock_key = f'{last_key}:lock'
+        last = cache.get(last_key) if self.count_key else None
+        locked = False
+        if last is None or last <= threshold:
+            count = self.object_list[:threshold + 1].count()
+            if count <= threshold:
+                if self.count_key:
+                    cache.set(last_key, count, None)
+                return count
+        else:
+            locked = cache.add(
+                lock_key, True, settings.POSTS_COUNT_CACHE_TIMEOUT
+            )
+            if not locked:
+                return last
+        try:
+            count = super().count
+            if self.count_key:
+                cache.set(last_key, count, None)
+        finally:
+            if locked:
+                cache.delete(lock_key)
+        return count
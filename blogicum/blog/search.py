@@ -0,0 +1,50 @@
+import re
+
+SEARCH_TABLE = 'blog_post_fts'
+MAX_SEARCH_TERMS = 8
+
+# Триггеры, которыми SQLite поддерживает индекс в актуальном состоянии.
+SEARCH_TRIGGERS = (
+    'blog_post_fts_insert', 'blog_post_fts_delete', 'blog_post_fts_update'
+)
+
+
+def get_missing_search_triggers(connection):
+    """Триггеры поискового индекса, которых нет в базе.
+
+    SQLite меняет схему blog_post, пересоздавая таблицу, и триггеры
+    индекса при этом удаляются. Поэтому миграция, меняющая Post,
+    должна заканчиваться пересозданием индекса, как 0012 и 0014.
+    """
+    if connection.vendor != 'sqlite':
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE name = %s OR (type = 'trigger' AND tbl_name = 'blog_post')",
+            [SEARCH_TABLE],
+        )
+        objects = cursor.fetchall()
+    if ('table', SEARCH_TABLE) not in objects:
+        return []
+    return [
+        name for name in SEARCH_TRIGGERS if ('trigger', name) not in objects
+    ]
+
+
+def get_search_terms(query):
+    """Слова поискового запроса без служебного синтаксиса FTS5."""
+    return re.findall(r'\w+', query or '')[:MAX_SEARCH_TERMS]
+
+
+def make_match_query(query):
+    """Запрос MATCH: все слова обязательны, последнее — как префикс.
+
+    Слова берутся в кавычки, поэтому операторы FTS5 из пользовательского
+    ввода не разбираются.
+    """
+    terms = get_search_terms(query)
+    if not terms:
+        return ''
+    *words, last = terms
+    return ' '.join([*(f'"{word}"' for word in words), f'"{last}"*'])
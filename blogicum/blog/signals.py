@@ -0,0 +1,190 @@
+from django.core.management.base import CommandError
+from django.db import connections
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import (
+    post_delete, post_migrate, post_save, pre_delete, pre_save
+)
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .caching import get_author_tags, get_post_tags, invalidate_tags
+from .jobs import enqueue
+from .models import Category, Comment, ImageBlob, Location, Post, User
+from .paginators import invalidate_post_counts
+from .search import get_missing_search_triggers
+from .tasks import make_image_variants
+
+# Отправляется, когда у отложенных публикаций наступила дата публикации.
+posts_published = Signal()
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    changes = {'updated_at': timezone.now()}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    Post.objects.filter(pk=instance.post_id).update(**changes)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id).update(
+        comment_count=Greatest(F('comment_count') - 1, Value(0)),
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=Post)
+def schedule_image_variants(sender, instance, raw, **kwargs):
+    if raw or not instance.image_variants_outdated:
+        return
+    enqueue(
+        make_image_variants,
+        key=f'image-variants:{instance.pk}',
+        post_id=instance.pk,
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_post_counts(sender, **kwargs):
+    invalidate_post_counts()
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_pages(sender, instance, raw, **kwargs):
+    instance._previous_page_tags = []
+    instance._previous_image = ''
+    if raw or instance.pk is None:
+        return
+    previous = Post.objects.filter(pk=instance.pk).values(
+        'category_id', 'author_id', 'image'
+    ).first()
+    if previous is not None:
+        instance._previous_page_tags = get_post_tags(
+            instance.pk, previous['category_id'], previous['author_id']
+        )
+        instance._previous_image = previous['image']
+
+
+@receiver(post_save, sender=Post)
+def count_image_references(sender, instance, raw, **kwargs):
+    previous = getattr(instance, '_previous_image', '')
+    current = instance.image.name or ''
+    if raw or previous == current:
+        return
+    ImageBlob.objects.retain([current] if current else [])
+    ImageBlob.objects.release([previous] if previous else [])
+
+
+@receiver(post_delete, sender=Post)
+def release_image_references(sender, instance, **kwargs):
+    ImageBlob.objects.release(instance.image_blob_names)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    invalidate_tags(
+        *getattr(instance, '_previous_page_tags', []),
+        *get_post_tags(
+            instance.pk, instance.category_id, instance.author_id
+        ),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    post = Post.objects.filter(pk=instance.post_id).values(
+        'category_id', 'author_id'
+    ).first()
+    if post is not None:
+        invalidate_tags(*get_post_tags(
+            instance.post_id, post['category_id'], post['author_id']
+        ))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_all_pages(sender, **kwargs):
+    invalidate_tags('all')
+
+
+def is_login_update(update_fields):
+    return update_fields is not None and set(update_fields) == {'last_login'}
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw, update_fields=None, **kwargs):
+    instance._previous_username = None
+    if raw or instance.pk is None or is_login_update(update_fields):
+        return
+    instance._previous_username = User.objects.filter(
+        pk=instance.pk
+    ).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_author_pages(sender, instance, update_fields=None, **kwargs):
+    """Сбрасывает профиль пользователя и страницы с его публикациями."""
+    if is_login_update(update_fields):
+        return
+    usernames = {instance.username}
+    previous = getattr(instance, '_previous_username', None)
+    if previous is not None:
+        usernames.add(previous)
+    invalidate_tags(*get_author_tags(instance.pk, *sorted(usernames)))
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+@receiver(post_save, sender=User)
+def touch_related_posts(sender, instance, raw=False, update_fields=None,
+                        **kwargs):
+    """Меняет версию постов, в карточках которых выводится объект."""
+    if raw or is_login_update(update_fields):
+        return
+    lookup = {
+        Category: 'category',
+        Location: 'location',
+        User: 'author',
+    }[sender]
+    Post.objects.filter(**{lookup: instance}).update(
+        updated_at=timezone.now()
+    )
+
+
+@receiver(posts_published)
+def invalidate_published_pages(sender, post_ids, **kwargs):
+    invalidate_post_counts()
+    posts = Post.objects.filter(pk__in=post_ids).values(
+        'pk', 'category_id', 'author_id'
+    )
+    for post in posts:
+        invalidate_tags(*get_post_tags(
+            post['pk'], post['category_id'], post['author_id']
+        ))
+
+
+@receiver(post_migrate)
+def check_search_triggers(sender, using, **kwargs):
+    if sender.label != 'blog':
+        return
+    missing = get_missing_search_triggers(connections[using])
+    if missing:
+        raise CommandError(
+            'В базе нет триггеров поискового индекса: '
+            f'{", ".join(missing)}. Миграция, меняющая Post, должна '
+            'заканчиваться пересозданием индекса, как 0012 и 0014.'
+        )
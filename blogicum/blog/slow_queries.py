@@ -0,0 +1,83 @@
+import hashlib
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils import timezone
+
+logger = logging.getLogger('blog.slow_queries')
+
+# Имя маршрута текущего запроса; задаёт CurrentRouteMiddleware.
+current_route = ContextVar('current_route', default=None)
+
+MAX_PARAMS_LENGTH = 500
+NORMALIZE = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def normalize_sql(sql):
+    """Текст запроса без значений: литералы и параметры заменены на ?."""
+    for pattern, replacement in NORMALIZE:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def fingerprint(sql):
+    return hashlib.md5(normalize_sql(sql).encode()).hexdigest()[:16]
+
+
+def explain(connection, sql, params):
+    """План запроса, полученный в обход обёрток и журнала запросов."""
+    prefix = (
+        'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    )
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(prefix + sql, params)
+        return [
+            ' '.join(str(column) for column in row)
+            for row in cursor.fetchall()
+        ]
+    except Exception as error:
+        return [f'EXPLAIN не выполнен: {error}']
+    finally:
+        cursor.close()
+
+
+def log_slow_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = (time.perf_counter() - started) * 1000
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        if threshold is not None and duration >= threshold:
+            connection = context['connection']
+            record = {
+                'time': timezone.now().isoformat(),
+                'fingerprint': fingerprint(sql),
+                'duration_ms': round(duration, 2),
+                'route': current_route.get(),
+                'database': connection.alias,
+                'sql': sql,
+                'plan': [] if many else explain(connection, sql, params),
+            }
+            if settings.SLOW_QUERY_LOG_PARAMS:
+                record['params'] = repr(params)[:MAX_PARAMS_LENGTH]
+            logger.warning(json.dumps(record, ensure_ascii=False))
+
+
+@receiver(connection_created)
+def install_slow_query_log(sender, connection, **kwargs):
+    if log_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, log_slow_query)
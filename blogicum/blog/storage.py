@@ -0,0 +1,72 @@
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# Каталог недописанных загрузок внутри MEDIA_ROOT: файл переносится
+# на место атомарным переименованием в пределах одной файловой системы.
+INCOMING_DIR = '.incoming'
+BLOB_NAME = re.compile(r'(?:^|/)(?P<digest>[0-9a-f]{64})\.\w+$')
+
+
+def get_blob_digest(name):
+    """Хеш из имени файла хранилища или None для обычного имени."""
+    match = BLOB_NAME.search(name)
+    return match['digest'] if match else None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, где имя файла — SHA-256 его содержимого.
+
+    Хеш считается по ходу записи, поэтому одинаковые загрузки
+    сохраняются один раз, а содержимое файла под данным именем
+    никогда не меняется. Из переданного имени сохраняются только
+    каталог и расширение.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        incoming = self.path(INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+        descriptor, temp_path = tempfile.mkstemp(dir=incoming)
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(descriptor, 'wb') as file:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    file.write(chunk)
+            name = self.get_blob_name(name, digest.hexdigest())
+            path = self.path(name)
+            if os.path.exists(path):
+                # Свежее время изменения не даёт сборщику удалить файл,
+                # пока новая ссылка на него ещё не сохранена.
+                os.utime(path)
+                return name
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, path)
+            temp_path = None
+        finally:
+            if temp_path is not None:
+                os.remove(temp_path)
+        return name
+
+    def get_blob_name(self, name, hexdigest):
+        directory, filename = posixpath.split(name)
+        extension = posixpath.splitext(filename)[1].lower()
+        return posixpath.join(
+            directory, hexdigest[:2], f'{hexdigest}{extension}'
+        )
+
+
+post_image_storage = ContentAddressedStorage()
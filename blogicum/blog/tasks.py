@@ -0,0 +1,66 @@
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMultiAlternatives
+from django.template import loader
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from .caching import get_post_tags, invalidate_tags
+from .jobs import task
+from .models import Post, User
+
+
+@task
+def make_image_variants(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        post.update_image_variants()
+        invalidate_tags(
+            *get_post_tags(post.pk, post.category_id, post.author_id)
+        )
+
+
+@task
+def send_email(subject, body, from_email, to, html_body=None):
+    message = EmailMultiAlternatives(subject, body, from_email, to)
+    if html_body:
+        message.attach_alternative(html_body, 'text/html')
+    message.send()
+
+
+@task
+def send_password_reset_email(user_id, domain, site_name, protocol,
+                              subject_template_name, email_template_name,
+                              from_email=None, html_email_template_name=None):
+    """Письмо со ссылкой для сброса пароля.
+
+    Токен создаётся здесь, а не при постановке в очередь, чтобы
+    действующая ссылка не хранилась в таблице заданий.
+    """
+    user = User.objects.filter(pk=user_id, is_active=True).first()
+    if user is None or not user.has_usable_password():
+        return
+    email = getattr(user, User.get_email_field_name())
+    if not email:
+        return
+    context = {
+        'email': email,
+        'domain': domain,
+        'site_name': site_name,
+        'uid': urlsafe_base64_encode(force_bytes(user.pk)),
+        'user': user,
+        'token': default_token_generator.make_token(user),
+        'protocol': protocol,
+    }
+    subject = ''.join(
+        loader.render_to_string(subject_template_name, context).splitlines()
+    )
+    html_body = None
+    if html_email_template_name is not None:
+        html_body = loader.render_to_string(html_email_template_name, context)
+    send_email(
+        subject,
+        loader.render_to_string(email_template_name, context),
+        from_email,
+        [email],
+        html_body=html_body,
+    )
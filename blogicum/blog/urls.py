@@ -11,6 +11,9 @@ post_urls = [
     path('<int:post_id>/',
          views.PostDetailView.as_view(),
          name='post_detail'),
+    path('<int:post_id>/comments/',
+         views.CommentListView.as_view(),
+         name='post_comments'),
     path('<int:post_id>/comment/',
          views.CommentCreateView.as_view(),
          name='add_comment'),
@@ -37,6 +40,7 @@ urlpatterns = [
          views.ProfileUpdateView.as_view(),
          name='edit_profile'),
     path('posts/', include(post_urls)),
+    path('search/', views.PostSearchView.as_view(), name='search'),
     path('profile/<str:username>/',
          views.ProfileListView.as_view(),
          name='profile'),
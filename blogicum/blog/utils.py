@@ -0,0 +1,35 @@
+from functools import wraps
+
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 10
+
+
+def cached_for_request(method):
+    """Кеширует результат метода представления на время запроса.
+
+    Экземпляр представления создаётся заново на каждый запрос,
+    поэтому значение хранится прямо в его атрибутах. Вызовы
+    с аргументами не кешируются.
+    """
+    attr_name = f'_cached_{method.__name__}'
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if args or kwargs:
+            return method(self, *args, **kwargs)
+        if attr_name not in self.__dict__:
+            self.__dict__[attr_name] = method(self)
+        return self.__dict__[attr_name]
+
+    return wrapper
+
+
+def make_excerpt(text, max_length):
+    """Начало текста публикации для карточки в ленте.
+
+    Совпадает с выводом фильтра `truncatewords` и ограничено
+    длиной поля.
+    """
+    excerpt = Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    return Truncator(excerpt).chars(max_length)
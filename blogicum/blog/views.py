@@ -1,27 +1,39 @@
-from django.db.models import Count
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.views.generic import (
     CreateView, DeleteView, DetailView, ListView, UpdateView
 )
 from django.urls import reverse_lazy
-from django.utils import timezone
+from django.utils.http import urlencode
 
 from .models import Post, Category, Comment
 from .mixins import (
-    OnlyAuthorMixin, PostSuccessUrlMixin, ProfileSuccesUrlMixin, CommentMixin
+    AnonymousPageCacheMixin,
+    CachedCountPaginationMixin,
+    CommentMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    ElidedPageRangeMixin,
+    OnlyAuthorMixin,
+    PostSuccessUrlMixin,
+    ProfileSuccesUrlMixin,
 )
 from .forms import PostForm, CommentForm, UserForm
+from .paginators import CursorPaginator
+from .utils import cached_for_request
 
 MAX_AMOUNT_POSTS = 10
+MAX_AMOUNT_COMMENTS = 10
+COMMENTS_ORDERING = ('created_at', 'id')
 
 User = get_user_model()
 
 
-def get_posts_queryset(filters=False, annotations=False):
+def get_posts_queryset(filters=False):
     base_query = Post.objects.select_related(
         'category',
         'location',
@@ -31,20 +43,38 @@ def get_posts_queryset(filters=False, annotations=False):
         base_query = base_query.filter(
             is_published=True,
             category__is_published=True,
-            pub_date__lte=timezone.now(),
+            is_live=True,
         )
-    if annotations:
-        base_query = base_query.annotate(
-            comment_count=Count('comments')
-        ).order_by('-pub_date')
     return base_query
 
 
-class CategoryListVIew(ListView):
+def get_visible_post(user, post_id):
+    post = get_object_or_404(get_posts_queryset(), pk=post_id)
+    if (
+        user != post.author
+        and (
+            not post.is_published
+            or not post.category.is_published
+            or not post.is_live
+        )
+    ):
+        raise Http404
+    return post
+
+
+class CategoryListVIew(
+    AnonymousPageCacheMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    CachedCountPaginationMixin,
+    ElidedPageRangeMixin,
+    ListView,
+):
     model = Category
     template_name = 'blog/category.html'
     paginate_by = MAX_AMOUNT_POSTS
 
+    @cached_for_request
     def get_category(self):
         category_slug = self.kwargs['category_slug']
         category = get_object_or_404(
@@ -56,11 +86,19 @@ class CategoryListVIew(ListView):
 
     def get_queryset(self):
         return get_posts_queryset(
-            filters=True,
-            annotations=True
+            filters=True
         ).filter(
             category=self.get_category()
-        ).select_related('category')
+        ).select_related('category').defer('text')
+
+    def get_count_key(self):
+        return f'category:{self.kwargs["category_slug"]}'
+
+    def get_cache_tags(self):
+        return [
+            *super().get_cache_tags(),
+            f'category:{self.kwargs["category_slug"]}',
+        ]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -70,12 +108,42 @@ class CategoryListVIew(ListView):
         return context
 
 
+class CommentListView(
+    AnonymousPageCacheMixin, CursorPaginationMixin, ListView
+):
+    """Очередная порция комментариев к посту без обвязки страницы."""
+
+    template_name = 'includes/comment_list.html'
+    paginate_by = MAX_AMOUNT_COMMENTS
+    cursor_ordering = COMMENTS_ORDERING
+
+    def use_cursor_pagination(self):
+        return True
+
+    def get_cache_tags(self):
+        return [*super().get_cache_tags(), f'post:{self.kwargs["post_id"]}']
+
+    @cached_for_request
+    def get_post(self):
+        return get_visible_post(self.request.user, self.kwargs['post_id'])
+
+    def get_queryset(self):
+        return self.get_post().comments.select_related('author')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post'] = self.get_post()
+        context['comments'] = context['page_obj']
+        return context
+
+
 class CommentCreateView(LoginRequiredMixin, PostSuccessUrlMixin, CreateView):
     model = Comment
     form_class = CommentForm
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
 
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.author = self.request.user
         post_id = self.kwargs['post_id']
@@ -118,37 +186,73 @@ class PostDeleteView(OnlyAuthorMixin, ProfileSuccesUrlMixin, DeleteView):
         return context
 
 
-class PostDetailView(DetailView):
+class PostDetailView(
+    AnonymousPageCacheMixin, ConditionalGetMixin, DetailView
+):
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
-    queryset = get_posts_queryset()
 
+    @cached_for_request
     def get_object(self):
-        post = super().get_object()
-        if (
-            self.request.user != post.author
-            and (
-                not post.is_published
-                or not post.category.is_published
-                or post.pub_date > timezone.now()
-            )
-        ):
-            raise Http404
-        return post
+        return get_visible_post(self.request.user, self.kwargs['post_id'])
+
+    def get_cache_tags(self):
+        return [*super().get_cache_tags(), f'post:{self.kwargs["post_id"]}']
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related('author')
-        )
+        context['comments'] = CursorPaginator(
+            self.object.comments.select_related('author'),
+            MAX_AMOUNT_COMMENTS,
+            ordering=COMMENTS_ORDERING,
+        ).page()
         return context
 
 
-class PostListView(ListView):
+class PostListView(
+    AnonymousPageCacheMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    CachedCountPaginationMixin,
+    ElidedPageRangeMixin,
+    ListView,
+):
     paginate_by = MAX_AMOUNT_POSTS
     template_name = 'blog/index.html'
-    queryset = get_posts_queryset(filters=True, annotations=True)
+
+    def get_queryset(self):
+        return get_posts_queryset(filters=True).defer('text')
+
+    def get_count_key(self):
+        return 'feed'
+
+    def get_cache_tags(self):
+        return [*super().get_cache_tags(), 'feed']
+
+
+class PostSearchView(AnonymousPageCacheMixin, ElidedPageRangeMixin, ListView):
+    template_name = 'blog/search.html'
+    paginate_by = MAX_AMOUNT_POSTS
+    cache_query_params = ('q', 'page')
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return get_posts_queryset(
+            filters=True
+        ).search(self.get_search_query()).defer('text')
+
+    def get_cache_tags(self):
+        return [*super().get_cache_tags(), 'feed']
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_search_query()
+        context['query'] = query
+        context['pagination_query'] = urlencode({'q': query}) + '&'
+        return context
 
 
 class PostUpdateView(OnlyAuthorMixin, PostSuccessUrlMixin, UpdateView):
@@ -158,11 +262,19 @@ class PostUpdateView(OnlyAuthorMixin, PostSuccessUrlMixin, UpdateView):
     pk_url_kwarg = 'post_id'
 
 
-class ProfileListView(ListView):
+class ProfileListView(
+    AnonymousPageCacheMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    CachedCountPaginationMixin,
+    ElidedPageRangeMixin,
+    ListView,
+):
     model = Post
     template_name = 'blog/profile.html'
     paginate_by = MAX_AMOUNT_POSTS
 
+    @cached_for_request
     def get_user(self):
         username = self.kwargs['username']
         user = get_object_or_404(User, username=username)
@@ -170,10 +282,20 @@ class ProfileListView(ListView):
 
     def get_queryset(self):
         queryset = get_posts_queryset(
-            filters=self.request.user != self.get_user(),
-            annotations=True
+            filters=self.request.user != self.get_user()
         )
-        return queryset.filter(author=self.get_user())
+        return queryset.filter(author=self.get_user()).defer('text')
+
+    def get_count_key(self):
+        visibility = (
+            'owner' if self.request.user == self.get_user() else 'public'
+        )
+        return f'profile:{self.kwargs["username"]}:{visibility}'
+
+    def get_cache_tags(self):
+        return [
+            *super().get_cache_tags(), f'profile:{self.kwargs["username"]}'
+        ]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -32,20 +33,48 @@ INSTALLED_APPS = [
 
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
-    'debug_toolbar',
 ]
 
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
 
+# 'page' — нумерованные страницы, 'cursor' — keyset-пагинация лент.
+POSTS_PAGINATION_MODE = 'page'
+
+POSTS_COUNT_CACHE_TIMEOUT = 60
+
+POSTS_COUNT_ESTIMATE_THRESHOLD = 10000
+
+PAGE_CACHE_TIMEOUT = 60 * 60
+
 LOGIN_URL = 'login'
 
 LOGIN_REDIRECT_URL = 'blog:index'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+# Медиафайлы отдаёт blog.media.serve_media. Если задан заголовок
+# 'X-Sendfile' (Apache, lighttpd) или 'X-Accel-Redirect' (nginx),
+# view только проверяет запрос, а файл отправляет веб-сервер;
+# для nginx MEDIA_ROOT должен быть доступен как internal location
+# MEDIA_ACCEL_REDIRECT_PREFIX.
+MEDIA_SENDFILE_HEADER = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+# Срок кеширования медиафайлов без хеша содержимого в имени, в секундах.
+MEDIA_MAX_AGE = 60 * 60
+
+# Ширины уменьшенных копий фото публикаций для srcset.
+POST_IMAGE_WIDTHS = (320, 640, 960, 1280)
+# Современные форматы копий в порядке предпочтения; формат без
+# поддержки в установленном Pillow пропускается.
+POST_IMAGE_FORMATS = ('AVIF', 'WEBP')
+
 MIDDLEWARE = [
+    'blog.middleware.ServerTimingMiddleware',
+    'blog.middleware.CurrentRouteMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,9 +82,76 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
+# Доля запросов, для которых ServerTimingMiddleware снимает замеры;
+# для отдельных маршрутов её можно задать по имени, например
+# {'blog:index': 0.1}.
+SERVER_TIMING_SAMPLE_RATE = 1.0
+
+SERVER_TIMING_ROUTE_SAMPLE_RATES = {}
+
+# Заголовок Server-Timing показывает время запросов к базе, поэтому
+# по умолчанию отдаётся только при DEBUG и сотрудникам; True — всем.
+# Журнал blog.timing пишется для всех замеренных запросов.
+SERVER_TIMING_PUBLIC = False
+
+# Запросы дольше порога попадают в SLOW_QUERY_LOG_FILE вместе с планом;
+# None отключает журнал. Сводка: manage.py slow_query_report.
+SLOW_QUERY_THRESHOLD_MS = 200
+
+SLOW_QUERY_LOG_FILE = BASE_DIR / 'slow_queries.jsonl'
+
+# Значения параметров запросов попадают в журнал только при True: среди
+# них бывают хеши паролей, ключи сессий и адреса почты.
+SLOW_QUERY_LOG_PARAMS = False
+
+# Фоновые задания: блокировка захваченного задания и паузы между
+# повторами после ошибок, в секундах.
+JOB_VISIBILITY_TIMEOUT = 300
+JOB_RETRY_DELAY = 10
+JOB_RETRY_MAX_DELAY = 3600
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {
+            'format': '%(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+        'slow_queries': {
+            'class': 'logging.FileHandler',
+            'filename': SLOW_QUERY_LOG_FILE,
+            'formatter': 'message',
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'blog.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        'blog.jobs': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        'blog.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+        },
+    },
+}
+
 ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES = [
@@ -77,13 +173,41 @@ TEMPLATES = [
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
+# Кеш общий для всех процессов: версии тегов страниц и счётчики
+# сбрасываются и из отдельных процессов — publish_scheduled, run_jobs,
+# import_fixture, seed_data, — и веб-процессы должны это видеть.
+# Каталог задаётся переменной окружения BLOGICUM_CACHE_DIR; тесты
+# подставляют свой, чтобы не трогать кеш сайта.
+CACHES = {
+    'default': {
+        'BACKEND': 'blog.cache_backends.SparselyCulledFileBasedCache',
+        'LOCATION': os.environ.get('BLOGICUM_CACHE_DIR', BASE_DIR / '.cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+            'CULL_EVERY': 100,
+        },
+    }
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Применяются к каждому новому соединению с SQLite, см. blog/db.py.
+# Пустой словарь оставляет настройки SQLite по умолчанию.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -1,9 +1,14 @@
+import re
+
 from django.contrib import admin
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.views import PasswordResetView
 from django.views.generic.edit import CreateView
-from django.urls import path, include, reverse_lazy
+from django.urls import path, include, re_path, reverse_lazy
+
+from blog.forms import QueuedPasswordResetForm
+from blog.media import serve_media
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
@@ -11,6 +16,11 @@ handler500 = 'pages.views.server_error'
 urlpatterns = [
     path('', include('blog.urls', namespace='blog')),
     path('admin/', admin.site.urls),
+    path(
+        'auth/password_reset/',
+        PasswordResetView.as_view(form_class=QueuedPasswordResetForm),
+        name='password_reset',
+    ),
     path('auth/', include('django.contrib.auth.urls')),
     path(
         'auth/registration/',
@@ -28,4 +38,10 @@ if settings.DEBUG:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+urlpatterns += (
+    re_path(
+        r'^{}(?P<path>.+)$'.format(re.escape(settings.MEDIA_URL.lstrip('/'))),
+        serve_media,
+        name='media',
+    ),
+)
@@ -1,6 +1,7 @@
 import os
 import re
 import time
+from copy import deepcopy
 from http import HTTPStatus
 from inspect import getsource
 from pathlib import Path
@@ -18,12 +19,16 @@ from typing import (
 
 import pytest
 from django.apps import apps
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
 from django.test import override_settings
 from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
 from mixer.backend.django import mixer as _mixer
 
 N_PER_FIXTURE = 3
@@ -41,6 +46,31 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(scope="session", autouse=True)
+def cache_dir(tmp_path_factory):
+    """Отдельный каталог кеша: тесты не должны трогать кеш сайта.
+
+    Каталог передаётся и через окружение, чтобы его видели процессы,
+    запущенные из тестов.
+    """
+    # Кеш берётся через caches, а не прокси cache: pytest при сборе
+    # фикстур обращается к атрибутам модулей, и прокси создал бы кеш
+    # в каталоге сайта ещё до подмены настроек.
+    location = str(tmp_path_factory.mktemp("cache"))
+    os.environ["BLOGICUM_CACHE_DIR"] = location
+    caches = deepcopy(settings.CACHES)
+    caches["default"]["LOCATION"] = location
+    with override_settings(CACHES=caches):
+        yield location
+    del os.environ["BLOGICUM_CACHE_DIR"]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    caches["default"].clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -133,6 +163,27 @@ def another_user_client(another_user):
     return client
 
 
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def get_page_queries(client: Client, url: str) -> List[str]:
+    """SQL-запросы, выполненные при загрузке страницы."""
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f"Страница `{url}` недоступна."
+    )
+    return [query["sql"] for query in captured.captured_queries]
+
+
+def get_count_queries(client: Client, url: str) -> List[str]:
+    """Запросы COUNT, выполненные при загрузке страницы."""
+    return [sql for sql in get_page_queries(client, url) if "COUNT(" in sql]
+
+
 def get_post_list_context_key(
         user_client, page_url, page_load_err_msg, key_missing_msg
 ):
@@ -363,6 +414,8 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
+                    or filename.endswith(".avif")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
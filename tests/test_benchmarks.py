@@ -0,0 +1,52 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _seed():
+    call_command(
+        "seed_data", users=5, categories=3, locations=2, posts=40,
+        comments=120, batch_size=16, seed=1,
+        stdout=StringIO(), stderr=StringIO(),
+    )
+
+
+def test_seed_data_creates_consistent_rows():
+    _seed()
+    assert Post.objects.count() == 40
+    assert Comment.objects.count() == 120
+    assert sum(
+        Post.objects.values_list("comment_count", flat=True)
+    ) == 120, "Убедитесь, что seed_data заполняет количество комментариев."
+    post = Post.objects.exclude(excerpt="").first()
+    assert post is not None, (
+        "Убедитесь, что seed_data заполняет вычисляемые поля публикаций."
+    )
+    assert list(Post.objects.search(post.title.split()[0]))
+
+
+def test_benchmark_views_covers_routes(tmp_path):
+    _seed()
+    caches["default"].set("site-key", "значение")
+    output = tmp_path / "results.json"
+    call_command(
+        "benchmark_views", repeat=1, output=str(output),
+        stdout=StringIO(), stderr=StringIO(),
+    )
+    assert caches["default"].get("site-key") == "значение", (
+        "Убедитесь, что benchmark_views не очищает кеш сайта."
+    )
+    results = json.loads(output.read_text(encoding="utf-8"))["results"]
+    routes = {result["route"] for result in results}
+    assert {
+        "blog:index", "blog:post_detail", "blog:profile", "pages:about"
+    } <= routes, "Убедитесь, что замеряются маршруты blog и pages."
+    for result in results:
+        assert {"p50_ms", "p99_ms", "queries", "bytes"} <= set(result)
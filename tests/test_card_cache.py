@@ -0,0 +1,50 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_card_is_cached_until_post_version_changes(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get("/")
+    type(post).objects.filter(pk=post.pk).update(title="Тихая правка")
+    assert "Тихая правка" not in user_client.get("/").content.decode(), (
+        "Убедитесь, что карточка публикации берётся из кеша, пока версия"
+        " публикации не изменилась."
+    )
+
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in user_client.get("/").content.decode(), (
+        "Убедитесь, что сохранение публикации меняет ключ кеша её карточки."
+    )
+
+
+@pytest.mark.parametrize("related", ["category", "location", "author"])
+def test_related_object_change_refreshes_card(
+        user_client, post_with_published_location, related
+):
+    post = post_with_published_location
+    user_client.get("/")
+    obj = getattr(post, related)
+    field = "username" if related == "author" else (
+        "title" if related == "category" else "name"
+    )
+    setattr(obj, field, "renamed")
+    obj.save()
+    assert "renamed" in user_client.get("/").content.decode(), (
+        "Убедитесь, что изменение категории, местоположения или автора"
+        " обновляет карточки связанных публикаций."
+    )
+
+
+def test_new_comment_refreshes_card(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get("/")
+    post.comments.create(author=post.author, text="Комментарий")
+    assert "Комментарии (1)" in user_client.get("/").content.decode(), (
+        "Убедитесь, что число комментариев в карточке обновляется."
+    )
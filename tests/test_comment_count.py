@@ -0,0 +1,73 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что при создании комментария увеличивается"
+        " сохранённое количество комментариев публикации."
+    )
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что при удалении комментария уменьшается"
+        " сохранённое количество комментариев публикации."
+    )
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=10)
+
+    call_command("recount_comments", stdout=StringIO())
+
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что команда `recount_comments` восстанавливает"
+        " количество комментариев публикаций."
+    )
+
+
+def test_saving_stale_post_keeps_comment_count(
+        user_client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    stale = Post.objects.get(pk=post.pk)
+    mixer.blend("blog.Comment", post=post)
+    stale.title = "Правка из открытой формы"
+    stale.save()
+    stale.refresh_from_db()
+    assert stale.comment_count == post.comments.count() == 1, (
+        "Убедитесь, что сохранение публикации, загруженной до появления"
+        " комментария, не перезаписывает количество комментариев."
+    )
+
+    post.refresh_from_db()
+    mixer.blend("blog.Comment", post=post)
+    response = user_client.post(
+        f"/posts/{post.pk}/edit/",
+        {
+            "title": "Правка через форму",
+            "text": post.text,
+            "pub_date": post.pub_date.strftime("%Y-%m-%dT%H:%M"),
+            "category": post.category_id,
+            "location": post.location_id,
+            "is_published": True,
+        },
+    )
+    assert response.status_code == 302
+    post.refresh_from_db()
+    assert post.comment_count == post.comments.count() == 2
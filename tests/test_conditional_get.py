@@ -0,0 +1,149 @@
+import time
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _urls(post):
+    return [
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    ]
+
+
+def _wait_next_second():
+    """Last-Modified отдаётся, только когда секунда изменения прошла."""
+    time.sleep(1 - time.time() % 1 + 0.01)
+
+
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_repeated_request_gets_not_modified(
+        request, client_name, post_with_published_location
+):
+    client = request.getfixturevalue(client_name)
+    _wait_next_second()
+    for url in _urls(post_with_published_location):
+        response = client.get(url)
+        assert response.has_header("ETag"), (
+            f"Убедитесь, что страница `{url}` отдаёт заголовок ETag."
+        )
+        assert response.has_header("Last-Modified"), (
+            f"Убедитесь, что страница `{url}` отдаёт заголовок"
+            " Last-Modified."
+        )
+        not_modified = client.get(
+            url, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED, (
+            f"Убедитесь, что страница `{url}` отвечает 304 на запрос"
+            " с актуальным If-None-Match."
+        )
+        not_modified = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED, (
+            f"Убедитесь, что страница `{url}` отвечает 304 на запрос"
+            " с актуальным If-Modified-Since."
+        )
+
+
+def test_not_modified_skips_rendering(
+        user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    etag = user_client.get(url)["ETag"]
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert not response.templates, (
+        "Убедитесь, что ответ 304 формируется без отрисовки шаблона."
+    )
+
+
+def test_new_comment_changes_etag(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    etags = {url: user_client.get(url)["ETag"] for url in _urls(post)}
+    post.comments.create(author=post.author, text="Комментарий")
+    for url, etag in etags.items():
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f"Убедитесь, что новый комментарий меняет ETag страницы `{url}`."
+        )
+
+
+def test_etag_depends_on_user(
+        client, user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    etag = client.get(url)["ETag"]
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что ETag страницы различается для разных пользователей."
+    )
+    assert "Cookie" in response["Vary"]
+
+
+def test_cached_page_answers_not_modified_without_queries(
+        client, post_with_published_location, django_assert_num_queries
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    etag = client.get(url)["ETag"]
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.parametrize("change", ["delete", "unpublish"])
+def test_last_modified_moves_forward_when_post_leaves_list(
+        user_client, post_with_published_location, change
+):
+    post = post_with_published_location
+    _wait_next_second()
+    url = f"/category/{post.category.slug}/"
+    last_modified = user_client.get(url)["Last-Modified"]
+    _wait_next_second()
+    if change == "delete":
+        post.delete()
+    else:
+        post.is_published = False
+        post.save()
+    _wait_next_second()
+    response = user_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что Last-Modified списка не откатывается назад, когда"
+        " публикация удаляется или скрывается."
+    )
+
+
+def test_empty_list_has_changing_validators(
+        user, user_client, mixer, published_category
+):
+    url = f"/category/{published_category.slug}/"
+    # Первый запрос заводит версию тега категории.
+    user_client.get(url)
+    _wait_next_second()
+    response = user_client.get(url)
+    assert response.has_header("Last-Modified"), (
+        "Убедитесь, что пустой список тоже отдаёт Last-Modified."
+    )
+    mixer.blend(
+        "blog.Post",
+        category=published_category,
+        author=user,
+        location=None,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что ETag пустого списка меняется с появлением"
+        " публикации."
+    )
+
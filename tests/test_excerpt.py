@@ -0,0 +1,87 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import MAX_LENGTH_CHAR_FIELD, Post
+from blog.utils import EXCERPT_WORDS, make_excerpt
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _words(count):
+    return " ".join(f"слово{number}" for number in range(count))
+
+
+def test_excerpt_keeps_text_up_to_word_limit():
+    text = _words(EXCERPT_WORDS)
+    assert make_excerpt(text, MAX_LENGTH_CHAR_FIELD) == text, (
+        "Убедитесь, что текст не длиннее лимита слов не обрезается."
+    )
+
+
+def test_excerpt_cuts_text_after_word_limit():
+    text = _words(EXCERPT_WORDS + 1)
+    assert make_excerpt(text, MAX_LENGTH_CHAR_FIELD) == (
+        f"{_words(EXCERPT_WORDS)} …"
+    ), "Убедитесь, что лишние слова заменяются многоточием."
+
+
+def test_excerpt_fits_field_length():
+    excerpt = make_excerpt("б" * (MAX_LENGTH_CHAR_FIELD + 1),
+                           MAX_LENGTH_CHAR_FIELD)
+    assert len(excerpt) == MAX_LENGTH_CHAR_FIELD and excerpt.endswith("…"), (
+        "Убедитесь, что начало текста не длиннее поля модели."
+    )
+
+
+def test_excerpt_of_empty_text():
+    assert make_excerpt("", MAX_LENGTH_CHAR_FIELD) == ""
+
+
+def test_save_fills_computed_fields(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        text=_words(EXCERPT_WORDS + 5),
+    )
+    post.refresh_from_db()
+    assert post.excerpt == make_excerpt(post.text, MAX_LENGTH_CHAR_FIELD), (
+        "Убедитесь, что при сохранении публикации заполняется начало текста."
+    )
+
+    post.text = ""
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt == "", (
+        "Убедитесь, что начало текста пересчитывается при изменении текста."
+    )
+
+
+def test_backfill_excerpts_rerun_changes_nothing(
+        mixer, user, published_category
+):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        text=_words(EXCERPT_WORDS + 1),
+    )
+    mixer.blend(
+        "blog.Post", author=user, category=published_category, text="",
+    )
+    Post.objects.update(excerpt="")
+
+    call_command("backfill_excerpts", stdout=StringIO())
+    versions = dict(Post.objects.values_list("pk", "updated_at"))
+    assert all(
+        post.excerpt == make_excerpt(post.text, MAX_LENGTH_CHAR_FIELD)
+        for post in Post.objects.all()
+    ), "Убедитесь, что `backfill_excerpts` заполняет начало текста."
+
+    out = StringIO()
+    call_command("backfill_excerpts", "--all", stdout=out)
+    assert "Обновлено публикаций: 0" in out.getvalue(), (
+        "Убедитесь, что повторный запуск `backfill_excerpts` ничего"
+        " не обновляет."
+    )
+    assert dict(Post.objects.values_list("pk", "updated_at")) == versions
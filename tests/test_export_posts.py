@@ -0,0 +1,57 @@
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _export(tmp_path, **options):
+    path = tmp_path / "posts.jsonl.gz"
+    call_command("export_posts", str(path), stderr=StringIO(), **options)
+    with gzip.open(path, "rt", encoding="utf-8") as stream:
+        return [json.loads(line) for line in stream]
+
+
+def test_export_nests_comments(tmp_path, mixer, user, another_user):
+    first, second, third = mixer.cycle(3).blend("blog.Post", author=user)
+    comments = [
+        mixer.blend("blog.Comment", post=post, author=another_user)
+        for post in (third, first, third)
+    ]
+    records = _export(tmp_path, chunk_size=1)
+    assert [record["id"] for record in records] == [
+        first.id, second.id, third.id
+    ]
+    assert [
+        [comment["id"] for comment in record["comments"]]
+        for record in records
+    ] == [[comments[1].id], [], [comments[0].id, comments[2].id]], (
+        "Убедитесь, что каждая публикация выгружается со своими"
+        " комментариями."
+    )
+    assert records[0]["author"] == user.username
+    assert records[0]["comments"][0]["author"] == another_user.username
+
+
+def test_export_filters(tmp_path, mixer, user, another_user):
+    old = mixer.blend("blog.Post", author=user)
+    type(old).objects.filter(pk=old.pk).update(
+        updated_at=timezone.now() - timezone.timedelta(days=2)
+    )
+    fresh = mixer.blend("blog.Post", author=user)
+    foreign = mixer.blend("blog.Post", author=another_user)
+
+    since = (timezone.now() - timezone.timedelta(days=1)).isoformat()
+    assert [r["id"] for r in _export(tmp_path, since=since)] == [
+        fresh.id, foreign.id
+    ], "Убедитесь, что --since выгружает только изменённые публикации."
+    assert [r["id"] for r in _export(tmp_path, author=user.username)] == [
+        old.id, fresh.id
+    ]
+    assert [
+        r["id"] for r in _export(tmp_path, category=foreign.category.slug)
+    ] == [foreign.id]
@@ -0,0 +1,111 @@
+import hashlib
+import os
+import time
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import ImageBlob
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def image_settings(settings, media_root):
+    settings.POST_IMAGE_WIDTHS = ()
+    settings.POST_IMAGE_FORMATS = ()
+
+
+def image_bytes(color="teal"):
+    buffer = BytesIO()
+    Image.new("RGB", (40, 30), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def upload(post, content, name="photo.JPG"):
+    post.image = SimpleUploadedFile(name, content, "image/jpeg")
+    post.save()
+    post.refresh_from_db()
+    return post.image.name
+
+
+def refcount(name):
+    return ImageBlob.objects.get(name=name).refcount
+
+
+def collect(**options):
+    call_command(
+        "collect_image_blobs", grace_hours=0, stdout=StringIO(), **options
+    )
+
+
+def test_same_upload_is_stored_once(mixer, post_with_published_location):
+    content = image_bytes()
+    other_post = mixer.blend(
+        "blog.Post", author=post_with_published_location.author
+    )
+    name = upload(post_with_published_location, content)
+    assert upload(other_post, content, "copy.jpg") == name, (
+        "Убедитесь, что одинаковые загрузки сохраняются в один файл."
+    )
+    digest = hashlib.sha256(content).hexdigest()
+    assert name == f"post_images/{digest[:2]}/{digest}.jpg", (
+        "Убедитесь, что имя файла — SHA-256 его содержимого."
+    )
+    assert refcount(name) == 2
+    assert len(os.listdir(os.path.dirname(
+        post_with_published_location.image.path
+    ))) == 1
+
+
+def test_replaced_and_deleted_images_are_collected(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    other_post = mixer.blend("blog.Post", author=post.author)
+    shared = upload(post, image_bytes())
+    upload(other_post, image_bytes())
+    storage = post.image.storage
+
+    replacement = upload(post, image_bytes("orange"))
+    assert (refcount(shared), refcount(replacement)) == (1, 1)
+    collect()
+    assert storage.exists(shared), (
+        "Убедитесь, что файл, на который ещё ссылаются, не удаляется."
+    )
+
+    other_post.delete()
+    assert refcount(shared) == 0
+    collect(dry_run=True)
+    assert storage.exists(shared)
+    collect()
+    assert not storage.exists(shared), (
+        "Убедитесь, что файлы без ссылок удаляются сборщиком."
+    )
+    assert not ImageBlob.objects.filter(name=shared).exists()
+    assert storage.exists(replacement)
+
+
+def test_grace_period_and_untracked_files(post_with_published_location):
+    name = upload(post_with_published_location, image_bytes())
+    ImageBlob.objects.all().delete()
+    storage = post_with_published_location.image.storage
+    orphan = storage.path("post_images/ab/orphan.jpg")
+    os.makedirs(os.path.dirname(orphan), exist_ok=True)
+    with open(orphan, "wb") as file:
+        file.write(b"orphan")
+
+    call_command("collect_image_blobs", stdout=StringIO())
+    assert os.path.exists(orphan), (
+        "Убедитесь, что недавние файлы не удаляются до конца отсрочки."
+    )
+    past = time.time() - 3600
+    os.utime(orphan, (past, past))
+    collect()
+    assert not os.path.exists(orphan)
+    assert storage.exists(name) and refcount(name) == 1, (
+        "Убедитесь, что пересчёт восстанавливает учёт файлов публикаций."
+    )
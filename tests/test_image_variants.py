@@ -0,0 +1,121 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def image_settings(settings, media_root):
+    settings.POST_IMAGE_WIDTHS = (320, 640, 1280)
+    settings.POST_IMAGE_FORMATS = ("WEBP", "NO-SUCH-FORMAT")
+
+
+def run_jobs():
+    call_command("run_jobs", burst=True, stdout=StringIO())
+
+
+def make_image(width, height, name="photo.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "teal").save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+@pytest.fixture
+def post(post_with_published_location):
+    post = post_with_published_location
+    post.image = make_image(1000, 500)
+    post.save()
+    run_jobs()
+    post.refresh_from_db()
+    return post
+
+
+def test_variants_are_created_narrower_than_source(post):
+    variants = post.image_variants
+    assert variants["source"] == post.image.name
+    assert (variants["width"], variants["height"]) == (1000, 500)
+    assert sorted(variants["variants"], key=int) == ["320", "640"], (
+        "Убедитесь, что копии шире оригинала не создаются."
+    )
+    storage = post.image.storage
+    with storage.open(variants["variants"]["320"]) as file:
+        assert Image.open(file).size == (320, 160)
+    assert list(variants["formats"]) == ["image/webp"], (
+        "Убедитесь, что создаются копии только в поддерживаемых форматах."
+    )
+    webp = variants["formats"]["image/webp"]
+    assert sorted(webp, key=int) == ["320", "640", "1000"], (
+        "Убедитесь, что копия в WebP создаётся и в полную ширину."
+    )
+    with storage.open(webp["1000"]) as file:
+        image = Image.open(file)
+        assert (image.format, image.size) == ("WEBP", (1000, 500))
+
+
+def test_card_and_detail_use_srcset(client, post):
+    for url in ("/", f"/posts/{post.pk}/"):
+        content = client.get(url).content.decode()
+        assert 'srcset="' in content and " 320w" in content, (
+            "Убедитесь, что фото выводится с атрибутом srcset."
+        )
+        assert 'width="1000" height="500"' in content
+        assert '<source type="image/webp"' in content, (
+            "Убедитесь, что копии в WebP предлагаются через <picture>."
+        )
+
+
+def test_variants_reach_cached_pages(client, post_with_published_location):
+    post = post_with_published_location
+    post.image = make_image(1000, 500)
+    post.save()
+    urls = ("/", f"/posts/{post.pk}/")
+    for url in urls:
+        assert " 320w" not in client.get(url).content.decode()
+    run_jobs()
+    for url in urls:
+        assert " 320w" in client.get(url).content.decode(), (
+            "Убедитесь, что после создания копий фото сбрасывается кеш"
+            f" страницы `{url}`."
+        )
+
+
+def test_new_image_replaces_variants(post):
+    storage = post.image.storage
+    old_names = [
+        *post.image_variants["variants"].values(),
+        *post.image_variants["formats"]["image/webp"].values(),
+    ]
+    post.image = make_image(700, 700, "other.jpg")
+    post.save()
+    run_jobs()
+    post.refresh_from_db()
+    assert list(post.image_variants["variants"]) == ["320", "640"]
+    call_command("collect_image_blobs", grace_hours=0, stdout=StringIO())
+    assert not any(storage.exists(name) for name in old_names), (
+        "Убедитесь, что копии прежнего фото удаляются сборщиком."
+    )
+
+    post.image = None
+    post.save()
+    run_jobs()
+    post.refresh_from_db()
+    assert post.image_variants == {}
+
+
+def test_backfill_image_variants(post):
+    type(post).objects.filter(pk=post.pk).update(image_variants={})
+    call_command("backfill_image_variants")
+    post.refresh_from_db()
+    assert post.image_variants["source"] == post.image.name
+
+
+def test_image_savings_report(post):
+    stdout = StringIO()
+    call_command("image_savings_report", stdout=stdout)
+    assert "image/webp" in stdout.getvalue(), (
+        "Убедитесь, что отчёт выводит экономию для каждого формата."
+    )
@@ -0,0 +1,118 @@
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from blog.management.commands.import_fixture import iter_json_array
+from blog.models import Comment, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+CREATED_AT = "2022-12-18T23:06:18.993Z"
+
+
+def _dump():
+    # Публикации идут раньше пользователя, как в db.json.
+    return [
+        {"model": "blog.category", "pk": 7, "fields": {
+            "created_at": CREATED_AT, "is_published": True,
+            "title": "Категория", "slug": "cat", "description": "Описание",
+        }},
+        {"model": "blog.post", "pk": 11, "fields": {
+            "created_at": CREATED_AT, "is_published": True,
+            "title": "Обед", "text": "Обед у В. А. Морозовой.",
+            "pub_date": "1897-02-13T00:00:00Z", "author": 5,
+            "category": 7, "location": None,
+        }},
+        {"model": "admin.logentry", "pk": 1, "fields": {}},
+        {"model": "auth.user", "pk": 5, "fields": {
+            "password": "!", "username": "morozova", "first_name": "",
+            "last_name": "", "email": "", "is_staff": False,
+            "is_active": True, "is_superuser": False,
+            "date_joined": CREATED_AT, "last_login": None,
+            "groups": [], "user_permissions": [],
+        }},
+        {"model": "blog.comment", "pk": 3, "fields": {
+            "text": "Комментарий", "post": 11, "author": 5,
+            "created_at": CREATED_AT,
+        }},
+    ]
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 64 * 1024])
+def test_iter_json_array_handles_chunk_boundaries(read_size):
+    items = _dump()
+    stream = io.StringIO(json.dumps(items, ensure_ascii=False, indent=2))
+    assert list(iter_json_array(stream, read_size)) == items
+
+
+def test_iter_json_array_rejects_truncated_input():
+    with pytest.raises(Exception):
+        list(iter_json_array(io.StringIO('[{"model": "blog.post"')))
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_import_fixture(tmp_path, compress):
+    content = json.dumps(_dump(), ensure_ascii=False).encode()
+    path = tmp_path / ("dump.json.gz" if compress else "dump.json")
+    path.write_bytes(gzip.compress(content) if compress else content)
+    out = io.StringIO()
+
+    call_command("import_fixture", str(path), batch_size=1, stdout=out)
+
+    post = Post.objects.get(pk=11)
+    assert post.author.username == "morozova"
+    assert post.created_at.year == 2022, (
+        "Убедитесь, что при загрузке сохраняются даты из дампа."
+    )
+    assert post.excerpt and post.is_live, (
+        "Убедитесь, что при загрузке заполняются вычисляемые поля"
+        " публикации."
+    )
+    assert post.comment_count == 1
+    assert Comment.objects.get(pk=3).created_at.year == 2022
+    assert list(Post.objects.search("обед")) == [post]
+    assert "пропущено: 1" in out.getvalue()
+
+
+def test_import_fixture_reports_conflicts(tmp_path):
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(_dump()), encoding="utf-8")
+    call_command("import_fixture", str(path), stdout=io.StringIO())
+    with pytest.raises(CommandError):
+        call_command("import_fixture", str(path), stdout=io.StringIO())
+    assert Post.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_fixture_removes_batches_after_error(tmp_path):
+    content = json.dumps(_dump(), ensure_ascii=False)
+    path = tmp_path / "dump.json"
+    # Обрезанный конец файла обнаруживается после первых пачек.
+    path.write_text(content[:content.index('"blog.comment"')],
+                    encoding="utf-8")
+    with pytest.raises(CommandError, match="сохранённых объектов: 3"):
+        call_command(
+            "import_fixture", str(path), batch_size=1, stdout=io.StringIO()
+        )
+    assert not Post.objects.exists() and not User.objects.exists(), (
+        "Убедитесь, что после ошибки загрузки сохранённые пачки удаляются."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_fixture_rejects_dangling_references(tmp_path):
+    dump = _dump()
+    dump[-1]["fields"]["post"] = 12
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(dump), encoding="utf-8")
+    with pytest.raises(CommandError):
+        call_command(
+            "import_fixture", str(path), batch_size=1, stdout=io.StringIO()
+        )
+    assert not Comment.objects.exists() and not Post.objects.exists(), (
+        "Убедитесь, что объекты со ссылками на незагруженные не остаются"
+        " в базе."
+    )
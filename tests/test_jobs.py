@@ -0,0 +1,166 @@
+import json
+import re
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.jobs import Heartbeat, Worker, enqueue, task
+from blog.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+calls = []
+
+
+@task
+def remember(value):
+    calls.append(value)
+
+
+@task
+def explode():
+    raise RuntimeError("сбой задачи")
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+
+def run_jobs(**options):
+    stdout = StringIO()
+    call_command("run_jobs", burst=True, stdout=stdout, **options)
+    return stdout.getvalue()
+
+
+def test_worker_runs_queued_jobs():
+    job = enqueue(remember, value=1)
+    enqueue(remember, value=2, delay=timedelta(hours=1))
+    assert "выполнено: 1" in run_jobs()
+    assert calls == [1], (
+        "Убедитесь, что исполнитель выполняет только задания, чей срок"
+        " наступил."
+    )
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (Job.DONE, 1)
+    assert job.finished_at is not None
+
+
+def test_failed_job_is_retried_then_marked_failed():
+    job = enqueue(explode, max_attempts=2)
+    run_jobs()
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (Job.QUEUED, 1), (
+        "Убедитесь, что задание с ошибкой возвращается в очередь."
+    )
+    assert "сбой задачи" in job.last_error
+    assert job.run_after > timezone.now(), (
+        "Убедитесь, что повтор откладывается."
+    )
+
+    Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    run_jobs()
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (Job.FAILED, 2), (
+        "Убедитесь, что после последней попытки задание помечается"
+        " ошибочным."
+    )
+
+
+def test_expired_lock_makes_job_available_again():
+    job = enqueue(remember, value="again")
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.RUNNING,
+        attempts=1,
+        locked_by="исчезнувший",
+        locked_until=timezone.now() - timedelta(seconds=1),
+    )
+    run_jobs()
+    job.refresh_from_db()
+    assert calls == ["again"] and job.status == Job.DONE, (
+        "Убедитесь, что задание с истёкшей блокировкой выполняется снова."
+    )
+
+    locked = enqueue(remember, value="locked")
+    Job.objects.filter(pk=locked.pk).update(
+        status=Job.RUNNING,
+        locked_until=timezone.now() + timedelta(minutes=5),
+    )
+    run_jobs()
+    assert "locked" not in calls
+
+
+def test_late_report_does_not_overwrite_new_owner():
+    job = enqueue(remember, value=1)
+    worker = Worker()
+    claimed = worker.claim("первый")
+    Job.objects.filter(pk=job.pk).update(locked_by="второй")
+    assert worker.finish(claimed, Job.DONE) == "lost"
+    job.refresh_from_db()
+    assert job.status == Job.RUNNING
+
+
+def test_enqueue_with_key_skips_duplicates():
+    first = enqueue(remember, key="same", value=1)
+    assert enqueue(remember, key="same", value=2) == first
+    assert Job.objects.count() == 1
+
+
+def test_password_reset_mail_is_sent_by_worker(client, user):
+    user.email = "reader@example.com"
+    user.save()
+    response = client.post(
+        "/auth/password_reset/", {"email": "reader@example.com"}
+    )
+    assert response.status_code == 302
+    assert not mail.outbox, (
+        "Убедитесь, что письмо для сброса пароля не отправляется"
+        " во время запроса."
+    )
+    payload = json.dumps(Job.objects.get().payload)
+    assert "/auth/reset/" not in payload, (
+        "Убедитесь, что ссылка для сброса пароля не хранится в задании."
+    )
+    run_jobs()
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == ["reader@example.com"]
+    link = re.search(r"/auth/reset/\S+/", mail.outbox[0].body)
+    assert link, "Убедитесь, что письмо содержит ссылку для сброса пароля."
+    response = client.get(link.group(0), follow=True)
+    assert response.context["validlink"], (
+        "Убедитесь, что ссылка из письма действительна."
+    )
+
+
+def test_heartbeat_extends_lock_of_running_job():
+    job = enqueue(remember, value=1)
+    claimed = Worker(visibility_timeout=60).claim("первый")
+    Job.objects.filter(pk=job.pk).update(
+        locked_until=timezone.now() + timedelta(seconds=1)
+    )
+    heartbeat = Heartbeat(claimed, timedelta(seconds=60))
+    assert heartbeat.beat()
+    job.refresh_from_db()
+    assert job.locked_until > timezone.now() + timedelta(seconds=50), (
+        "Убедитесь, что блокировка выполняющегося задания продлевается."
+    )
+
+    Job.objects.filter(pk=job.pk).update(locked_by="второй")
+    assert not heartbeat.beat(), (
+        "Убедитесь, что блокировка чужого задания не продлевается."
+    )
+
+
+def test_job_stats():
+    enqueue(remember, value=1)
+    run_jobs()
+    enqueue(remember, value=2)
+    stdout = StringIO()
+    call_command("job_stats", stdout=stdout)
+    output = stdout.getvalue()
+    assert f"{remember.task_name}: в очереди 1" in output
+    assert "выполнено 1" in output
@@ -0,0 +1,100 @@
+import hashlib
+
+import pytest
+from django.core.files.base import ContentFile
+
+from blog.storage import post_image_storage
+
+pytestmark = [pytest.mark.usefixtures("media_root")]
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def blob_url():
+    name = post_image_storage.save("post_images/a.jpg", ContentFile(CONTENT))
+    return f"/media/{name}"
+
+
+@pytest.fixture
+def plain_url(media_root):
+    (media_root / "plain.txt").write_bytes(b"plain text")
+    return "/media/plain.txt"
+
+
+def content(response):
+    return b"".join(response.streaming_content)
+
+
+def test_full_response_and_cache_headers(client, blob_url, plain_url):
+    response = client.get(blob_url)
+    assert response.status_code == 200
+    assert content(response) == CONTENT
+    assert response["Content-Type"] == "image/jpeg"
+    assert response["Accept-Ranges"] == "bytes"
+    assert response["ETag"] == f'"{hashlib.sha256(CONTENT).hexdigest()}"'
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с хешем содержимого в имени кешируются"
+        " навсегда."
+    )
+    response = client.get(plain_url)
+    assert "immutable" not in response["Cache-Control"]
+    assert "Last-Modified" in response
+
+
+def test_conditional_requests(client, blob_url):
+    etag = client.get(blob_url)["ETag"]
+    response = client.get(blob_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=10000-", (10000, 10239)),
+    ("bytes=-16", (10224, 10239)),
+    ("bytes=10230-20000", (10230, 10239)),
+])
+def test_byte_ranges(client, blob_url, header, expected):
+    response = client.get(blob_url, HTTP_RANGE=header)
+    start, end = expected
+    assert response.status_code == 206
+    assert response["Content-Range"] == f"bytes {start}-{end}/10240"
+    assert content(response) == CONTENT[start:end + 1], (
+        "Убедитесь, что отдаётся запрошенный диапазон байтов."
+    )
+
+
+def test_unsatisfiable_and_stale_ranges(client, blob_url):
+    response = client.get(blob_url, HTTP_RANGE="bytes=20000-")
+    assert response.status_code == 416
+    assert response["Content-Range"] == "bytes */10240"
+    response = client.get(
+        blob_url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"другая-версия"'
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("X-Accel-Redirect", "/protected-media/"),
+    ("X-Sendfile", None),
+])
+def test_sendfile_offload(client, settings, blob_url, header, expected):
+    settings.MEDIA_SENDFILE_HEADER = header
+    response = client.get(blob_url)
+    assert response.status_code == 200
+    assert not response.content, (
+        "Убедитесь, что при выгрузке файл отдаёт веб-сервер."
+    )
+    name = blob_url[len("/media/"):]
+    if expected:
+        assert response[header] == expected + name
+    else:
+        assert response[header] == post_image_storage.path(name)
+
+
+@pytest.mark.parametrize("path", [
+    "/media/missing.jpg", "/media/../settings.py", "/media/.incoming/x",
+])
+def test_missing_and_hidden_files(client, path):
+    assert client.get(path).status_code == 404
@@ -0,0 +1,212 @@
+import subprocess
+import sys
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _page_urls(post):
+    return [
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    ]
+
+
+def _assert_served_from_cache(client, url, django_assert_num_queries):
+    client.get(url)
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    assert response.status_code == 200
+
+
+def test_anonymous_pages_are_cached(
+        client, post_with_published_location, django_assert_num_queries
+):
+    for url in _page_urls(post_with_published_location):
+        _assert_served_from_cache(client, url, django_assert_num_queries)
+
+
+def test_unused_query_params_share_cached_page(
+        client, post_with_published_location, django_assert_num_queries
+):
+    client.get("/?page=1")
+    with django_assert_num_queries(0):
+        response = client.get("/?page=1&utm_source=mail&page=1")
+    assert response.status_code == 200, (
+        "Убедитесь, что параметры запроса, которые view не читает,"
+        " не входят в ключ кеша страницы."
+    )
+    client.get("/search/?q=b")
+    with django_assert_num_queries(0):
+        client.get("/search/?ref=2&q=b")
+
+
+def test_logged_in_users_bypass_cache(
+        user_client, post_with_published_location
+):
+    user_client.get("/")
+    Post = type(post_with_published_location)
+    Post.objects.filter(pk=post_with_published_location.pk).update(
+        title="Новый заголовок", updated_at=timezone.now()
+    )
+    assert "Новый заголовок" in user_client.get("/").content.decode(), (
+        "Убедитесь, что авторизованные пользователи получают страницы"
+        " в обход кеша."
+    )
+
+
+def test_post_change_invalidates_its_pages(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    for url in _page_urls(post):
+        client.get(url)
+
+    post.title = "Обновлённый заголовок"
+    post.save()
+
+    for url in _page_urls(post):
+        content = client.get(url).content.decode("utf-8")
+        assert "Обновлённый заголовок" in content, (
+            f"Убедитесь, что кеш страницы `{url}` сбрасывается при"
+            " изменении публикации."
+        )
+
+
+def test_moved_post_leaves_old_category(
+        client, post_with_published_location, another_category
+):
+    post = post_with_published_location
+    old_url = f"/category/{post.category.slug}/"
+    assert post.title in client.get(old_url).content.decode("utf-8")
+
+    post.category = another_category
+    post.save()
+
+    assert post.title not in client.get(old_url).content.decode("utf-8"), (
+        "Убедитесь, что при переносе публикации в другую категорию"
+        " сбрасывается кеш страницы прежней категории."
+    )
+
+
+def test_comment_invalidates_post_page(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    client.get(f"/posts/{post.id}/")
+    comment = mixer.blend("blog.Comment", post=post)
+    content = client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert f"comment_{comment.id}" in content, (
+        "Убедитесь, что новый комментарий сбрасывает кеш страницы поста."
+    )
+
+
+def test_category_change_invalidates_feed(
+        client, post_with_published_location
+):
+    category = post_with_published_location.category
+    client.get("/")
+    category.title = "Переименованная категория"
+    category.save()
+    assert "Переименованная категория" in client.get("/").content.decode()
+
+
+def test_scheduled_post_goes_live(
+        client, mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    assert post.title not in client.get("/").content.decode("utf-8")
+
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    call_command("publish_scheduled", "--once", stdout=StringIO())
+
+    assert post.title in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что команда `publish_scheduled` выпускает отложенные"
+        " публикации и сбрасывает кеш ленты."
+    )
+
+
+def test_tag_versions_are_shared_between_processes():
+    from blog.caching import get_tag_versions
+
+    [before] = get_tag_versions(["feed"])
+    subprocess.run(
+        [
+            sys.executable, "manage.py", "shell", "-c",
+            "from blog.caching import _bump_tags; _bump_tags(['feed'])",
+        ],
+        cwd=settings.BASE_DIR,
+        check=True,
+        capture_output=True,
+    )
+    assert get_tag_versions(["feed"]) != [before], (
+        "Убедитесь, что кеш общий для процессов: сброс тегов из"
+        " publish_scheduled или run_jobs должен быть виден веб-процессам."
+    )
+
+
+def test_registration_keeps_cached_pages(
+        client, django_user_model, post_with_published_location,
+        django_assert_num_queries
+):
+    client.get("/")
+    django_user_model.objects.create_user(username="newcomer")
+    with django_assert_num_queries(0):
+        client.get("/")
+
+
+def test_author_change_invalidates_only_author_pages(
+        client, mixer, post_with_published_location, another_user,
+        django_assert_num_queries
+):
+    post = post_with_published_location
+    commented = mixer.blend(
+        "blog.Post", author=another_user, category=post.category
+    )
+    mixer.blend("blog.Comment", post=commented, author=post.author)
+    other_profile = f"/profile/{another_user.username}/"
+    urls = [*_page_urls(post), f"/posts/{commented.id}/"]
+    for url in [*urls, other_profile]:
+        client.get(url)
+
+    post.author.username = "renamed_author"
+    post.author.save()
+
+    for url in [url for url in urls if "/profile/" not in url]:
+        assert "renamed_author" in client.get(url).content.decode(), (
+            f"Убедитесь, что изменение автора сбрасывает кеш страницы `{url}`."
+        )
+    with django_assert_num_queries(0):
+        client.get(other_profile)
+
+
+def test_file_cache_checks_size_every_few_writes(tmp_path):
+    from blog.cache_backends import SparselyCulledFileBasedCache
+
+    cache = SparselyCulledFileBasedCache(
+        str(tmp_path), {"OPTIONS": {"MAX_ENTRIES": 5, "CULL_EVERY": 10}}
+    )
+    for number in range(9):
+        cache.set(f"key{number}", number)
+    assert len(list(tmp_path.iterdir())) == 9
+    cache.set("key9", 9)
+    assert len(list(tmp_path.iterdir())) < 10, (
+        "Убедитесь, что переполнение кеша проверяется раз в CULL_EVERY"
+        " записей."
+    )
@@ -0,0 +1,242 @@
+import base64
+import json
+import re
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.paginators import invalidate_post_counts
+from conftest import N_PER_PAGE, get_count_queries
+
+pytestmark = [pytest.mark.django_db]
+
+CURSOR_RE = re.compile(r'href="\?cursor=([\w-]+)"')
+
+
+def _cursors(response):
+    content = response.content.decode("utf-8")
+    return CURSOR_RE.findall(content)
+
+
+@override_settings(POSTS_PAGINATION_MODE="cursor")
+def test_cursor_pagination_walks_feed(
+        client, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    expected_ids = [
+        post.id for post in sorted(
+            posts, key=lambda post: (post.pub_date, post.id), reverse=True
+        )
+    ]
+
+    seen_ids = []
+    response = client.get("/")
+    assert response.context["page_obj"].next_cursor in _cursors(response), (
+        "Убедитесь, что в шаблоне пагинации выводится ссылка с курсором"
+        " следующей страницы."
+    )
+    pages = []
+    while True:
+        page_obj = response.context["page_obj"]
+        pages.append([post.id for post in page_obj])
+        seen_ids.extend(pages[-1])
+        if not page_obj.has_next():
+            break
+        response = client.get(f"/?cursor={page_obj.next_cursor}")
+        assert response.status_code == 200
+
+    assert seen_ids == expected_ids, (
+        "Убедитесь, что keyset-пагинация выводит все публикации ленты"
+        " по одному разу, «от новых к старым»."
+    )
+    assert all(len(page) <= N_PER_PAGE for page in pages)
+
+    previous = client.get(
+        f"/?cursor={response.context['page_obj'].previous_cursor}"
+    )
+    assert [post.id for post in previous.context["page_obj"]] == pages[-2], (
+        "Убедитесь, что ссылка на предыдущую страницу keyset-пагинации"
+        " возвращает предыдущую страницу ленты."
+    )
+
+
+@override_settings(POSTS_PAGINATION_MODE="cursor")
+def test_page_number_urls_keep_working(
+        client, many_posts_with_published_locations
+):
+    response = client.get("/?page=2")
+    assert response.status_code == 200
+    assert response.context["page_obj"].number == 2, (
+        "Убедитесь, что ссылки вида `?page=N` продолжают работать."
+    )
+
+
+def _cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+@pytest.mark.parametrize("payload", [
+    ["n", ["x", "y"]],
+    ["n", ["2024-01-01T00:00:00+00:00", "abc"]],
+])
+def test_invalid_cursor_returns_404(client, post_with_published_location,
+                                    payload):
+    assert client.get("/?cursor=not-a-cursor").status_code == 404
+    urls = ["/", f"/posts/{post_with_published_location.id}/comments/"]
+    for url in urls:
+        response = client.get(url, {"cursor": _cursor(payload)})
+        assert response.status_code == 404, (
+            f"Убедитесь, что курсор с некорректными значениями полей"
+            f" на странице `{url}` даёт 404, а не ошибку сервера."
+        )
+
+
+def test_page_range_is_elided(mixer, client, user, published_category):
+    mixer.cycle(N_PER_PAGE * 15).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+    response = client.get("/?page=8")
+    page_range = list(response.context["page_range"])
+    ellipsis = response.context["paginator"].ELLIPSIS
+    assert page_range == [
+        1, ellipsis, 5, 6, 7, 8, 9, 10, 11, ellipsis, 15
+    ], (
+        "Убедитесь, что в шаблон передаётся сокращённый список страниц:"
+        " первая, последняя и по три страницы вокруг текущей."
+    )
+    content = response.content.decode("utf-8")
+    assert content.count('class="page-item') == len(page_range) + 4
+
+
+def test_feed_count_is_cached(
+        user_client, many_posts_with_published_locations
+):
+    assert get_count_queries(user_client, "/")
+    assert not get_count_queries(user_client, "/?page=2"), (
+        "Убедитесь, что количество публикаций ленты берётся из кеша."
+    )
+
+    post = many_posts_with_published_locations[0]
+    post.is_published = False
+    post.save()
+    assert get_count_queries(user_client, "/"), (
+        "Убедитесь, что кеш количества публикаций сбрасывается при"
+        " снятии публикации."
+    )
+    assert user_client.get("/").context["paginator"].count == (
+        len(many_posts_with_published_locations) - 1
+    )
+
+
+@override_settings(POSTS_COUNT_ESTIMATE_THRESHOLD=N_PER_PAGE)
+def test_count_falls_back_to_estimate(many_posts_with_published_locations):
+    from blog.models import Post
+    from blog.paginators import CachedCountPaginator
+
+    Post.objects.filter(
+        pk=many_posts_with_published_locations[-1].pk
+    ).delete()
+    paginator = CachedCountPaginator(
+        Post.objects.order_by("pk"), N_PER_PAGE
+    )
+    with CaptureQueriesContext(connection) as context:
+        assert paginator.count >= N_PER_PAGE + 1
+    assert all(
+        "LIMIT" in query["sql"] for query in context.captured_queries
+        if "COUNT(" in query["sql"]
+    ), (
+        "Убедитесь, что для выборки без условий при превышении порога"
+        " используется оценка количества публикаций."
+    )
+
+
+@override_settings(POSTS_COUNT_ESTIMATE_THRESHOLD=N_PER_PAGE)
+def test_filtered_list_over_threshold_counts_exactly(
+        client, mixer, many_posts_with_published_locations
+):
+    hidden = many_posts_with_published_locations[:3]
+    for post in hidden:
+        post.is_published = False
+        post.save()
+    mixer.cycle(5).blend("blog.Post", is_published=False)
+    expected = len(many_posts_with_published_locations) - len(hidden)
+
+    response = client.get("/")
+    paginator = response.context["paginator"]
+    assert paginator.count == expected, (
+        "Убедитесь, что для отфильтрованного списка не используется"
+        " оценка по всей таблице."
+    )
+    last_page = client.get(f"/?page={paginator.num_pages}")
+    assert last_page.status_code == 200
+    assert len(last_page.context["page_obj"]) == (
+        expected - N_PER_PAGE * (paginator.num_pages - 1)
+    )
+    assert len(get_count_queries(client, "/?page=2")) == 0, (
+        "Убедитесь, что точное количество кешируется."
+    )
+    invalidate_post_counts()
+    counts = get_count_queries(client, "/?page=1")
+    assert len(counts) == 1 and "LIMIT" not in counts[0], (
+        "Убедитесь, что известный как большой отфильтрованный список"
+        " считается одним запросом, без пробного подсчёта."
+    )
+
+
+@override_settings(POSTS_COUNT_ESTIMATE_THRESHOLD=N_PER_PAGE)
+def test_large_feed_serves_last_count_while_recounting(
+        user_client, many_posts_with_published_locations
+):
+    user_client.get("/")
+    invalidate_post_counts()
+    # Другой запрос уже пересчитывает количество ленты.
+    caches["default"].add("posts-count-last:feed:lock", True)
+    assert not get_count_queries(user_client, "/"), (
+        "Убедитесь, что пока количество большой ленты пересчитывается,"
+        " остальные запросы получают прежнее значение."
+    )
+    assert user_client.get("/?page=2").context["paginator"].count == len(
+        many_posts_with_published_locations
+    )
+
+
+def test_comments_are_paginated(client, mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Comment", post=post
+    )
+    response = client.get(f"/posts/{post.id}/")
+    shown = [comment.id for comment in response.context["comments"]]
+    assert len(shown) == N_PER_PAGE, (
+        "Убедитесь, что на странице поста выводится ограниченное"
+        " количество комментариев."
+    )
+
+    more_re = re.compile(r'href="(/posts/\d+/comments/\?cursor=[\w-]+)"')
+    url = more_re.search(response.content.decode("utf-8")).group(1)
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        content = response.content.decode("utf-8")
+        assert "<html" not in content
+        shown.extend(comment.id for comment in response.context["comments"])
+        match = more_re.search(content)
+        url = match and match.group(1)
+
+    assert shown == [comment.id for comment in comments], (
+        "Убедитесь, что порции комментариев выводят все комментарии"
+        " поста по порядку и без повторов."
+    )
+
+
+def test_comments_fragment_hides_unpublished_post(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert client.get(f"/posts/{post.id}/comments/").status_code == 404
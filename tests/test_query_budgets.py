@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import caches
+from django.utils import timezone
+
+from conftest import get_page_queries
+
+pytestmark = [pytest.mark.django_db]
+
+# Наибольшее число SQL-запросов на страницу. Оно не должно зависеть
+# от количества публикаций и комментариев: рост выдаёт N+1.
+BUDGETS = {
+    "/": (2, 4),
+    "/category/{category}/": (3, 5),
+    "/profile/{author}/": (3, 5),
+    "/posts/{post}/": (2, 4),
+    "/posts/{post}/comments/": (2, 4),
+    "/search/?q=Бюджет": (2, 4),
+    "/posts/create/": (None, 4),
+    "/posts/{post}/edit/": (None, 5),
+    "/posts/{post}/delete/": (None, 4),
+    "/posts/{post}/edit_comment/{comment}/": (None, 3),
+    "/posts/{post}/delete_comment/{comment}/": (None, 3),
+    "/edit_profile/": (None, 2),
+}
+
+
+@pytest.fixture
+def dataset(mixer, user):
+    """Наполняет базу; повторный вызов добавляет ещё строк."""
+    state = {"posts": [], "size": 0}
+
+    def grow(posts, comments_per_post):
+        for _ in range(posts):
+            # У каждой публикации свои автор комментариев, категория
+            # и местоположение, чтобы потерянный select_related
+            # давал отдельный запрос на каждую строку.
+            post = mixer.blend(
+                "blog.Post",
+                title="Бюджет",
+                author=user,
+                category=mixer.blend("blog.Category", is_published=True),
+                location=mixer.blend("blog.Location", is_published=True),
+                is_published=True,
+                pub_date=timezone.now() - timedelta(days=1),
+            )
+            for _ in range(comments_per_post):
+                mixer.blend(
+                    "blog.Comment", post=post, author=mixer.blend("auth.User")
+                )
+            state["posts"].append(post)
+        post = state["posts"][0]
+        for _ in range(comments_per_post):
+            mixer.blend(
+                "blog.Comment", post=post, author=mixer.blend("auth.User")
+            )
+        state["comment"] = mixer.blend("blog.Comment", post=post, author=user)
+        return state
+
+    return grow
+
+
+def _format(queries):
+    return "\n".join(
+        f"{number}. {sql}" for number, sql in enumerate(queries, 1)
+    )
+
+
+@pytest.mark.parametrize("role", ["anonymous", "author"])
+@pytest.mark.parametrize("url", BUDGETS)
+def test_query_budget(client, user_client, dataset, url, role):
+    budget = BUDGETS[url][role == "author"]
+    if budget is None:
+        pytest.skip("Страница доступна только автору.")
+    http_client = user_client if role == "author" else client
+
+    counts = []
+    for posts, comments_per_post in ((2, 1), (12, 12)):
+        state = dataset(posts, comments_per_post)
+        post = state["posts"][0]
+        page_url = url.format(
+            post=post.id,
+            comment=state["comment"].id,
+            category=post.category.slug,
+            author=post.author.username,
+        )
+        caches["default"].clear()
+        queries = get_page_queries(http_client, page_url)
+        assert len(queries) <= budget, (
+            f"Страница `{page_url}` выполнила {len(queries)} SQL-запросов"
+            f" при бюджете {budget}:\n{_format(queries)}"
+        )
+        counts.append(len(queries))
+    assert counts[0] == counts[1], (
+        f"Число SQL-запросов страницы `{url}` растёт вместе с количеством"
+        f" публикаций и комментариев ({counts[0]} → {counts[1]}):\n"
+        f"{_format(queries)}"
+    )
@@ -0,0 +1,55 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def own_comment(mixer, user, post_with_published_location):
+    return mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+
+
+def test_profile_loads_user_once(
+        client, user_client, user, post_with_published_location,
+        django_assert_num_queries
+):
+    url = f"/profile/{user.username}/"
+    # пользователь, количество публикаций, публикации
+    with django_assert_num_queries(3):
+        client.get(url)
+    # + сессия и пользователь запроса
+    with django_assert_num_queries(5):
+        user_client.get(url)
+
+
+def test_category_loads_category_once(
+        client, post_with_published_location, django_assert_num_queries
+):
+    url = f"/category/{post_with_published_location.category.slug}/"
+    # категория, количество публикаций, публикации
+    with django_assert_num_queries(3):
+        client.get(url)
+
+
+@pytest.mark.parametrize(
+    ("url", "author_queries", "stranger_queries"),
+    [
+        # пост, сессия, пользователь, варианты полей формы
+        ("/posts/{post.id}/edit/", 5, 3),
+        ("/posts/{post.id}/delete/", 4, 3),
+        # сессия, пользователь, комментарий
+        ("/posts/{post.id}/edit_comment/{comment.id}/", 3, 3),
+        ("/posts/{post.id}/delete_comment/{comment.id}/", 3, 3),
+    ],
+)
+def test_author_views_load_object_once(
+        user_client, another_user_client, post_with_published_location,
+        own_comment, django_assert_num_queries,
+        url, author_queries, stranger_queries
+):
+    url = url.format(post=post_with_published_location, comment=own_comment)
+    with django_assert_num_queries(author_queries):
+        assert user_client.get(url).status_code == 200
+    with django_assert_num_queries(stranger_queries):
+        assert another_user_client.get(url).status_code == 302
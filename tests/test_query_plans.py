@@ -0,0 +1,82 @@
+import pytest
+from django.db import connection
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+INDEXED_TABLES = ("blog_post", "blog_comment")
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_scans(plan, sql=""):
+    """Шаги плана, читающие таблицу целиком.
+
+    Просмотр индекса в порядке сортировки при LIMIT останавливается
+    после нужного числа строк, поэтому полным не считается.
+    """
+    ordered_by_index = " LIMIT " in sql and not any(
+        "TEMP B-TREE FOR ORDER BY" in step for step in plan
+    )
+    return [
+        step for step in plan
+        if any(step.startswith(f"SCAN {table}") for table in INDEXED_TABLES)
+        and not (ordered_by_index and " USING " in step)
+    ]
+
+
+def assert_no_full_scans(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    for query in context.captured_queries:
+        sql = query["sql"]
+        if not sql.startswith("SELECT") or not any(
+                table in sql for table in INDEXED_TABLES
+        ):
+            continue
+        plan = explain(sql)
+        assert not full_scans(plan, sql), (
+            f"Запрос страницы `{url}` выполняется полным просмотром"
+            f" таблицы:\n{sql}\n" + "\n".join(plan)
+        )
+
+
+@pytest.mark.parametrize("url", ["/", "/?page=2", "/?cursor="])
+def test_feed_uses_index(client, many_posts_with_published_locations, url):
+    assert_no_full_scans(client, url)
+
+
+def test_category_uses_index(
+        client, many_posts_with_published_locations, published_category
+):
+    assert_no_full_scans(client, f"/category/{published_category.slug}/")
+
+
+def test_profile_uses_index(
+        client, user_client, user, many_posts_with_published_locations
+):
+    url = f"/profile/{user.username}/"
+    assert_no_full_scans(client, url)
+    assert_no_full_scans(user_client, url)
+
+
+def test_post_comments_use_index(client, mixer, post_with_published_location):
+    mixer.cycle(3).blend("blog.Comment", post=post_with_published_location)
+    assert_no_full_scans(client, f"/posts/{post_with_published_location.id}/")
+
+
+def test_scheduled_posts_use_index(future_posts):
+    from blog.models import Post
+
+    queryset = Post.objects.filter(is_live=False, pub_date__lte=timezone.now())
+    sql, params = queryset.values_list("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        plan = [row[-1] for row in cursor.fetchall()]
+    assert not full_scans(plan), "\n".join(plan)
@@ -0,0 +1,118 @@
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(mixer, user, published_location, published_category):
+    def make(title, text, **kwargs):
+        fields = {
+            "author": user,
+            "location": published_location,
+            "category": published_category,
+            "pub_date": timezone.now() - timezone.timedelta(days=1),
+            "is_published": True,
+            **kwargs,
+        }
+        return mixer.blend("blog.Post", title=title, text=text, **fields)
+    return make
+
+
+def _found_ids(client, query):
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == 200
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_search_ranks_title_matches_first(user_client, make_post):
+    in_text = make_post("Заметка", "Сегодня в меню ежевика и малина.")
+    in_title = make_post("Ежевика", "Ягоды в саду.")
+    make_post("Другое", "Ничего общего.")
+    assert _found_ids(user_client, "ежевика") == [in_title.id, in_text.id], (
+        "Убедитесь, что поиск находит публикации по заголовку и тексту"
+        " и выводит совпадения в заголовке выше."
+    )
+
+
+def test_search_index_follows_edits_and_deletes(user_client, make_post):
+    post = make_post("Черника", "Ягоды.")
+    post.title = "Малина"
+    post.save()
+    assert _found_ids(user_client, "черника") == []
+    assert _found_ids(user_client, "малина") == [post.id]
+    post.delete()
+    assert _found_ids(user_client, "малина") == []
+
+
+def test_search_respects_visibility(user_client, mixer, make_post):
+    unpublished_category = mixer.blend("blog.Category", is_published=False)
+    make_post("Клюква скрыта", "Текст.", is_published=False)
+    make_post("Клюква в скрытой категории", "Текст.",
+              category=unpublished_category)
+    make_post(
+        "Клюква будущая", "Текст.",
+        pub_date=timezone.now() + timezone.timedelta(days=1),
+    )
+    visible = make_post("Клюква", "Текст.")
+    assert _found_ids(user_client, "клюква") == [visible.id], (
+        "Убедитесь, что поиск выдаёт только опубликованные публикации."
+    )
+
+
+def test_search_ignores_query_syntax(user_client, make_post):
+    post = make_post("Брусника", "Текст.")
+    assert _found_ids(user_client, 'брус"*:') == [post.id], (
+        "Убедитесь, что символы синтаксиса FTS5 в запросе не вызывают"
+        " ошибку, а последнее слово ищется как префикс."
+    )
+    assert _found_ids(user_client, "") == []
+
+
+def test_search_pagination_keeps_query(user_client, make_post):
+    for number in range(12):
+        make_post(f"Крыжовник {number}", "Текст.")
+    response = user_client.get("/search/", {"q": "крыжовник"})
+    assert "?q=%D0%BA%D1%80%D1%8B%D0%B6%D0%BE%D0%B2%D0%BD%D0%B8%D0%BA&amp;page=2" in response.content.decode(), (
+        "Убедитесь, что ссылки пагинации результатов поиска сохраняют"
+        " поисковый запрос."
+    )
+
+
+def test_admin_search_uses_index(admin_client, make_post):
+    post = make_post("Смородина", "Текст.")
+    make_post("Другое", "Текст.")
+    response = admin_client.get("/admin/blog/post/", {"q": "смородин"})
+    assert list(response.context["cl"].result_list) == [post]
+
+
+def test_search_triggers_survive_migrations():
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+            " AND tbl_name = 'blog_post'"
+        )
+        triggers = {name for name, in cursor.fetchall()}
+    assert triggers == {
+        "blog_post_fts_insert", "blog_post_fts_delete", "blog_post_fts_update"
+    }, (
+        "Убедитесь, что миграции, пересоздающие таблицу публикаций,"
+        " восстанавливают триггеры поискового индекса."
+    )
+
+
+def test_migrate_fails_without_search_triggers():
+    from django.apps import apps
+    from django.core.management.base import CommandError
+    from django.db import DEFAULT_DB_ALIAS, connection
+
+    from blog.signals import check_search_triggers
+
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TRIGGER blog_post_fts_update")
+    with pytest.raises(CommandError, match="blog_post_fts_update"):
+        check_search_triggers(
+            sender=apps.get_app_config("blog"), using=DEFAULT_DB_ALIAS
+        )
@@ -0,0 +1,79 @@
+import json
+import logging
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import override_settings
+
+from blog.middleware import ServerTimingMiddleware
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _metrics(header):
+    return {
+        part.split(";")[0].strip(): part for part in header.split(",")
+    }
+
+
+def test_server_timing_header_and_log(
+        user, user_client, post_with_published_location, caplog
+):
+    user.is_staff = True
+    user.save()
+    url = f"/posts/{post_with_published_location.id}/"
+    with caplog.at_level(logging.INFO, logger="blog.timing"):
+        response = user_client.get(url)
+    metrics = _metrics(response["Server-Timing"])
+    assert {"db", "tpl", "view", "total"} <= set(metrics), (
+        "Убедитесь, что заголовок Server-Timing содержит время запросов"
+        " к базе, отрисовки шаблона, view и всего запроса."
+    )
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["route"] == "blog:post_detail"
+    assert record["status"] == 200
+    assert record["db_queries"] > 0
+    assert f'desc="{record["db_queries"]} SQL"' in metrics["db"]
+    assert record["render_ms"] > 0
+
+
+@override_settings(
+    SERVER_TIMING_SAMPLE_RATE=1.0,
+    SERVER_TIMING_ROUTE_SAMPLE_RATES={"blog:index": 0},
+    SERVER_TIMING_PUBLIC=True,
+)
+def test_routes_can_be_excluded_from_sampling(client, caplog):
+    with caplog.at_level(logging.INFO, logger="blog.timing"):
+        response = client.get("/")
+    assert not response.has_header("Server-Timing"), (
+        "Убедитесь, что замеры не снимаются для маршрутов с нулевой"
+        " долей в SERVER_TIMING_ROUTE_SAMPLE_RATES."
+    )
+    assert not caplog.records
+    assert client.get("/pages/about/").has_header("Server-Timing")
+
+
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_header_hidden_from_visitors(request, client_name, caplog):
+    client = request.getfixturevalue(client_name)
+    with caplog.at_level(logging.INFO, logger="blog.timing"):
+        response = client.get("/pages/about/")
+    assert not response.has_header("Server-Timing"), (
+        "Убедитесь, что заголовок Server-Timing не отдаётся посетителям,"
+        " кроме сотрудников."
+    )
+    assert caplog.records, (
+        "Убедитесь, что замеры по-прежнему пишутся в журнал."
+    )
+
+
+def test_header_shown_in_debug(rf, settings):
+    request = rf.get("/")
+    request.user = AnonymousUser()
+    middleware = ServerTimingMiddleware(get_response=None)
+    assert not middleware.show_header(request, HttpResponse())
+    settings.DEBUG = True
+    assert middleware.show_header(request, HttpResponse()), (
+        "Убедитесь, что при DEBUG заголовок Server-Timing отдаётся всем."
+    )
@@ -0,0 +1,95 @@
+import json
+import logging
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+from blog.slow_queries import fingerprint
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def keep_log_file_clean(monkeypatch):
+    """Записи проверяются через caplog, а не через файл журнала."""
+    monkeypatch.setattr(
+        logging.getLogger("blog.slow_queries"), "handlers", []
+    )
+
+
+def test_fingerprint_ignores_values():
+    assert fingerprint(
+        "SELECT * FROM blog_post WHERE id IN (1, 2, 3) AND title = 'a'"
+    ) == fingerprint(
+        "SELECT *  FROM blog_post WHERE id IN (%s, %s) AND title = %s"
+    )
+    assert fingerprint("SELECT 1 FROM blog_post") != fingerprint(
+        "SELECT 1 FROM blog_comment"
+    )
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+def test_slow_query_logged_with_plan_and_route(
+        client, post_with_published_location, caplog
+):
+    with caplog.at_level(logging.WARNING, logger="blog.slow_queries"):
+        client.get(f"/posts/{post_with_published_location.id}/")
+    records = [json.loads(record.getMessage()) for record in caplog.records]
+    post_queries = [
+        record for record in records if 'FROM "blog_post"' in record["sql"]
+    ]
+    assert post_queries, (
+        "Убедитесь, что запросы дольше SLOW_QUERY_THRESHOLD_MS попадают"
+        " в журнал медленных запросов."
+    )
+    record = post_queries[0]
+    assert record["route"] == "blog:post_detail", (
+        "Убедитесь, что в журнал записывается имя маршрута запроса."
+    )
+    assert record["plan"] and "blog_post" in " ".join(record["plan"]), (
+        "Убедитесь, что в журнал записывается план запроса."
+    )
+
+
+@pytest.mark.parametrize("log_params", [False, True])
+def test_slow_query_params_logged_only_on_request(
+        user, caplog, log_params
+):
+    with override_settings(
+        SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_LOG_PARAMS=log_params
+    ), caplog.at_level(logging.WARNING, logger="blog.slow_queries"):
+        type(user).objects.filter(pk=user.pk).update(password="secret-hash")
+    logged = "\n".join(record.getMessage() for record in caplog.records)
+    assert ("secret-hash" in logged) is log_params, (
+        "Убедитесь, что значения параметров попадают в журнал медленных"
+        " запросов только при SLOW_QUERY_LOG_PARAMS = True."
+    )
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=None)
+def test_slow_query_log_can_be_disabled(client, caplog):
+    with caplog.at_level(logging.WARNING, logger="blog.slow_queries"):
+        client.get("/")
+    assert not caplog.records
+
+
+def test_report_ranks_by_total_time(tmp_path):
+    records = [
+        ("a" * 16, 300, "blog:index"),
+        ("b" * 16, 200, "blog:profile"),
+        ("b" * 16, 200, "blog:profile"),
+    ]
+    path = tmp_path / "slow.jsonl"
+    path.write_text("\n".join(json.dumps({
+        "fingerprint": key, "duration_ms": duration, "route": route,
+        "sql": "SELECT 1", "plan": ["SCAN blog_post"],
+    }) for key, duration, route in records), encoding="utf-8")
+    out = StringIO()
+    call_command("slow_query_report", str(path), stdout=out)
+    output = out.getvalue()
+    assert output.index("b" * 16) < output.index("a" * 16), (
+        "Убедитесь, что отчёт сортирует запросы по суммарному времени."
+    )
+    assert "blog:profile ×2" in output
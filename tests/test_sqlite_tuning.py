@@ -0,0 +1,47 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_pragmas_applied_to_new_connections():
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA synchronous")
+        synchronous = cursor.fetchone()[0]
+        cursor.execute("PRAGMA temp_store")
+        temp_store = cursor.fetchone()[0]
+        cursor.execute("PRAGMA busy_timeout")
+        busy_timeout = cursor.fetchone()[0]
+    assert (synchronous, temp_store) == (1, 2), (
+        "Убедитесь, что к соединению с SQLite применяются"
+        " synchronous=NORMAL и temp_store=MEMORY."
+    )
+    assert busy_timeout > 0, (
+        "Убедитесь, что для соединения с SQLite задан busy_timeout."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_reports_both_modes(mixer, user, published_category):
+    mixer.cycle(30).blend(
+        "blog.Post", author=user, category=published_category,
+        location=None,
+    )
+    out = StringIO()
+    call_command(
+        "benchmark_sqlite", seconds=0.2, readers=1, writers=1, stdout=out,
+    )
+    output = out.getvalue()
+    assert "default:" in output and "tuned:" in output
+    assert "записей 0/с" not in output, (
+        "Убедитесь, что сравнение пишет комментарии в таблицы блога."
+    )
+    assert "чтений 0/с" not in output
+
+
+def test_benchmark_needs_posts():
+    with pytest.raises(CommandError):
+        call_command("benchmark_sqlite", seconds=0.1, stdout=StringIO())